@@ -13,10 +13,13 @@
     'depends': ['project', 'mail', 'project_requirement'],
     'data': [
         'security/ir.model.access.csv',
+        'security/project_report_job_security.xml',
+        'data/ir_cron_data.xml',
         'views/project_views.xml',
         'views/project_flash_report_line_views.xml',
         'views/project_tracking_report_line_views.xml',
         'views/project_update_mail_templates.xml',
+        'views/project_report_job_views.xml',
         'views/project_update_views.xml',
         'wizards/project_update_wizard_views.xml',
         'views/project_menus.xml',
@@ -1,6 +1,9 @@
 from . import common
+from . import common_excel
+from . import ir_attachment
 from . import mail_compose_message
 from . import project
 from . import project_flash_report_line
+from . import project_report_job
 from . import project_tracking_report_line
 from . import project_update
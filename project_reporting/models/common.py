@@ -9,3 +9,32 @@ PROJECT_STATUS_SELECTION = [
 
 # Standard department name for general project department lines
 STANDARD_DEPARTMENT_NAME = "Tout département confondu"
+
+# Number of tracking report lines above which the Excel report is written in streaming mode
+TRACKING_REPORT_STREAMING_THRESHOLD = 5000
+
+# Reports generated in the background
+REPORT_JOB_TYPE_SELECTION = [
+    ('flash', 'Flash Report (PDF)'),
+    ('tracking', 'Suivi Projet (Excel)'),
+]
+
+REPORT_JOB_STATE_SELECTION = [
+    ('pending', 'En attente'),
+    ('running', 'En cours'),
+    ('done', 'Terminé'),
+    ('failed', 'Échec'),
+]
+
+# Number of reports rendered at the same time, each one holding a database connection
+REPORT_JOB_WORKERS = 2
+
+# Seconds after which a report still running is considered interrupted
+REPORT_JOB_TIMEOUT = 3600
+
+# Number of generated attachments kept per update and report type, older ones are garbage collected
+REPORT_ATTACHMENT_RETENTION = 3
+
+# Version of the layout of the reports, to increase whenever the templates or the workbook change
+# so that the attachments generated with the previous layout are rendered again
+REPORT_LAYOUT_VERSION = 1
@@ -0,0 +1,203 @@
+"""
+Common Excel utilities for the tracking report.
+This module centralizes the workbook formats and the logo images shared across report generations.
+"""
+
+import base64
+import io
+from collections import namedtuple
+
+from PIL import Image
+
+from odoo.tools.lru import LRU
+
+# Main colors
+PRIMARY_BLUE = '#0b5394'  # Main blue color for headers, requirements, data bars
+WHITE = '#ffffff'  # White for backgrounds and text
+# Professional progress bar colors with good contrast for text
+LIGHT_BLUE = '#b3c6e7'  # Light blue for progress bars
+SUCCESS_GREEN = '#6aa84f'  # Green for 100% complete values
+
+# Workbook formats of the tracking report, by name
+TRACKING_REPORT_FORMATS = {
+    # Title of the worksheets
+    'header': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'font_size': 20,
+        'bg_color': PRIMARY_BLUE,
+        'font_color': WHITE,
+    },
+    # Header for the first two columns - white background with blue text
+    'table_header': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'bg_color': WHITE,
+        'border': 1,
+        'text_wrap': True,
+        'font_color': PRIMARY_BLUE,
+        'font_size': 13,
+    },
+    # Header for columns from Sous-Exigences to Commentaires - blue background with white text
+    'table_header_blue': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'bg_color': PRIMARY_BLUE,
+        'border': 1,
+        'text_wrap': True,
+        'font_color': WHITE,
+        'font_size': 13,
+    },
+    'logo': {
+        'bg_color': WHITE,
+        'border': 1,
+        'border_color': 'black',
+    },
+    # Department cells with white background and blue text (bold)
+    'department': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'text_wrap': True,
+        'border': 1,
+        'bg_color': WHITE,
+        'font_color': PRIMARY_BLUE,
+        'border_color': 'black',
+        'font_size': 13,
+    },
+    # Requirement cells with thick borders to match the group border style
+    'requirement': {
+        'bold': True,
+        'align': 'center',
+        'valign': 'vcenter',
+        'text_wrap': True,
+        'border': 1,
+        'bg_color': PRIMARY_BLUE,
+        'font_color': WHITE,
+        'border_color': 'black',
+        'font_size': 13,
+        'left': 2,
+        'right': 2,
+    },
+    # Requirement cells between the first and last rows of a group, in streaming mode
+    'requirement_middle': {
+        'border': 1,
+        'bg_color': PRIMARY_BLUE,
+        'border_color': 'black',
+        'left': 2,
+        'right': 2,
+    },
+    # Subrequirement column, always thick left border as this is leftmost column of the table
+    'subrequirement': {
+        'border': 1,
+        'border_color': 'black',
+        'font_color': PRIMARY_BLUE,
+        'left': 2,
+    },
+    'percentage': {
+        'border': 1,
+        'border_color': 'black',
+        'num_format': '0%',
+        'font_color': PRIMARY_BLUE,
+        'font_size': 10,
+        'align': 'center',
+    },
+    'date': {
+        'border': 1,
+        'border_color': 'black',
+        'num_format': 'dd/mm/yyyy',
+        'font_color': PRIMARY_BLUE,
+        'font_size': 10,
+        'align': 'center',
+    },
+    # Comments column, always thick right border as this is rightmost column
+    'comment': {
+        'border': 1,
+        'border_color': 'black',
+        'font_color': PRIMARY_BLUE,
+        'right': 2,
+    },
+    # Conditional format for 100% values
+    'complete': {
+        'bold': True,
+        'font_color': PRIMARY_BLUE,
+        'num_format': '0%',
+        'align': 'center',
+    },
+}
+
+# Columns of the tracking report lines read to write the report
+TrackingReportRow = namedtuple('TrackingReportRow', [
+    'lot_number', 'department', 'requirement', 'subrequirement',
+    'design_implementation_percentage', 'validation_percentage', 'integration_percentage',
+    'delivery_planned_date', 'delivery_actual_date', 'mep_planned_date', 'mep_actual_date',
+    'comments',
+])
+
+# Number of logo images kept decoded in each worker process
+LOGO_CACHE_SIZE = 32
+
+# Decoded logos with their placement, keyed by attachment checksum and cell size
+_logo_cache = LRU(LOGO_CACHE_SIZE)
+
+
+class FormatRegistry:
+    """
+    Workbook formats built from declarative definitions.
+
+    Each distinct format (a definition with its border overrides) is added to the workbook
+    the first time it is requested, then reused for every cell written with it.
+    """
+
+    def __init__(self, workbook, definitions=None):
+        """
+        Args:
+            workbook: xlsxwriter workbook the formats belong to
+            definitions: Format properties by name, the tracking report formats by default
+        """
+        self.workbook = workbook
+        self.definitions = definitions or TRACKING_REPORT_FORMATS
+        self._formats = {}
+
+    def get(self, name, **overrides):
+        """Return the workbook format of a definition, with the given properties overridden"""
+        key = (name, *sorted(overrides.items()))
+        cell_format = self._formats.get(key)
+        if cell_format is None:
+            cell_format = self.workbook.add_format(dict(self.definitions[name], **overrides))
+            self._formats[key] = cell_format
+        return cell_format
+
+
+def get_logo_placement(checksum, load_image, cell_width, cell_height):
+    """
+    Return a logo image with the scale and offsets to center it in a cell.
+
+    The image is only decoded and measured on the first call for a checksum in the process,
+    the same content always has the same checksum so cached entries never go stale.
+
+    Args:
+        checksum: Checksum of the attachment holding the logo
+        load_image: Callable returning the base64-encoded image, only called when it is not cached
+        cell_width: Target cell width in px
+        cell_height: Target cell height in px
+    Returns:
+        (bytes, float, int, int): image data, scale factor, x_offset, y_offset
+    """
+    key = (checksum, cell_width, cell_height)
+    placement = _logo_cache.get(key)
+    if placement is None:
+        image_data = base64.b64decode(load_image())
+        with Image.open(io.BytesIO(image_data)) as img:
+            img_width, img_height = img.size
+        x_scale = min(1.0, cell_width / img_width)
+        y_scale = min(1.0, cell_height / img_height)
+        scale = min(x_scale, y_scale)
+        x_offset = int((cell_width - img_width * scale) / 2)
+        y_offset = int((cell_height - img_height * scale) / 2)
+        placement = (image_data, scale, x_offset, y_offset)
+        _logo_cache[key] = placement
+    return placement
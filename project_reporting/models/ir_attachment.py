@@ -0,0 +1,12 @@
+from odoo import models, fields
+from .common import REPORT_JOB_TYPE_SELECTION
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    # Generated project update reports, reused as long as their content fingerprint is unchanged
+    project_report_type = fields.Selection(REPORT_JOB_TYPE_SELECTION, string='Type de rapport de projet',
+                                           readonly=True)
+    project_report_fingerprint = fields.Char(string='Empreinte du rapport de projet', readonly=True,
+                                             index='btree_not_null')
@@ -0,0 +1,231 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from psycopg2 import errors
+
+from odoo import models, fields, api, SUPERUSER_ID
+from .common import (
+    REPORT_JOB_TYPE_SELECTION,
+    REPORT_JOB_STATE_SELECTION,
+    REPORT_JOB_WORKERS,
+    REPORT_JOB_TIMEOUT
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class ProjectReportJob(models.Model):
+    """
+    Request of a project update report rendered in the background.
+
+    Jobs are queued from the project update and rendered by a cron with a limited number of workers,
+    so that heavy reports do not tie up the web workers. The requesting user is notified when the
+    file is ready.
+    """
+    _name = 'project.report.job'
+    _description = 'Génération de rapport'
+    _order = 'id desc'
+
+    update_id = fields.Many2one('project.update', string='Mise à jour du projet', required=True,
+                                ondelete='cascade', readonly=True, index=True)
+    project_id = fields.Many2one(related='update_id.project_id', string='Projet', store=True)
+    report_type = fields.Selection(REPORT_JOB_TYPE_SELECTION, string='Rapport', required=True, readonly=True)
+    state = fields.Selection(REPORT_JOB_STATE_SELECTION, string='État', default='pending', required=True,
+                             readonly=True, index=True)
+    user_id = fields.Many2one('res.users', string='Demandé par', required=True, readonly=True,
+                              default=lambda self: self.env.user)
+    attachment_id = fields.Many2one('ir.attachment', string='Fichier', readonly=True, ondelete='set null')
+    date_started = fields.Datetime(string='Début', readonly=True)
+    date_done = fields.Datetime(string='Fin', readonly=True)
+    duration = fields.Float(string='Durée (secondes)', digits=(16, 1), readonly=True)
+    error_message = fields.Text(string='Erreur', readonly=True)
+
+    def init(self):
+        """A user can only queue a report once at a time for an update"""
+        self.env.cr.execute(f"""
+            DROP INDEX IF EXISTS {self._table}_active_request_uniq;
+            CREATE UNIQUE INDEX IF NOT EXISTS {self._table}_active_user_request_uniq
+            ON {self._table} (update_id, report_type, user_id)
+            WHERE state IN ('pending', 'running')
+        """)
+
+    @api.depends('report_type', 'update_id.name')
+    def _compute_display_name(self):
+        report_types = dict(REPORT_JOB_TYPE_SELECTION)
+        for job in self:
+            job.display_name = f"{report_types.get(job.report_type, '')} - {job.update_id.name or ''}"
+
+    @api.model
+    def _enqueue(self, update, report_type):
+        """
+        Queue the generation of a report of an update and wake up the report cron.
+        An identical request of the user still pending or running is reused instead of queuing a new one,
+        so that every requester is notified of their own job.
+
+        Returns:
+            tuple: (job, created) where created is False when an identical request was already queued
+        """
+        domain = [('update_id', '=', update.id), ('report_type', '=', report_type),
+                  ('user_id', '=', self.env.uid), ('state', 'in', ('pending', 'running'))]
+        job = self.search(domain, limit=1)
+        if job:
+            return job, False
+
+        try:
+            # Concurrent identical requests are caught by the unique index
+            with self.env.cr.savepoint():
+                job = self.create({'update_id': update.id, 'report_type': report_type})
+        except errors.UniqueViolation:
+            return self.search(domain, limit=1), False
+
+        self.env.ref('project_reporting.ir_cron_process_report_jobs').sudo()._trigger()
+        return job, True
+
+    @api.model
+    def _cron_process_report_jobs(self, workers=REPORT_JOB_WORKERS):
+        """
+        Render the pending report jobs, at most `workers` at the same time across all the cron runs.
+
+        The jobs are claimed with SKIP LOCKED so that concurrent runs never render the same job, and
+        each job is rendered and committed with its own cursor in a worker thread. The cron triggers
+        itself again while jobs are left pending.
+
+        Returns:
+            dict: Summary with the keys 'claimed', 'done' and 'failed'
+        """
+        summary = {'claimed': 0, 'done': 0, 'failed': 0}
+
+        # Jobs interrupted by a server restart or a killed worker free their slot
+        stale_jobs = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - timedelta(seconds=REPORT_JOB_TIMEOUT)),
+        ])
+        if stale_jobs:
+            stale_jobs.write({'state': 'failed', 'error_message': "Génération interrompue."})
+            stale_jobs._notify_user()
+
+        available_slots = workers - self.search_count([('state', '=', 'running')])
+        if available_slots <= 0:
+            return summary
+
+        self.env.cr.execute(f"""
+            UPDATE {self._table}
+            SET state = 'running', date_started = NOW() AT TIME ZONE 'UTC'
+            WHERE id IN (
+                SELECT id FROM {self._table}
+                WHERE state = 'pending'
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id
+        """, [available_slots])
+        job_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.invalidate_model(['state', 'date_started'])
+        summary['claimed'] = len(job_ids)
+        if not job_ids:
+            return summary
+
+        # The workers read the claimed jobs through their own cursors
+        self.env.cr.commit()
+
+        dbname, context = self.env.cr.dbname, dict(self.env.context)
+        with ThreadPoolExecutor(max_workers=len(job_ids)) as executor:
+            for succeeded in executor.map(lambda job_id: self._process_report_job(dbname, context, job_id), job_ids):
+                summary['done' if succeeded else 'failed'] += 1
+
+        _logger.info("Report jobs: %s rendered, %s failed", summary['done'], summary['failed'])
+
+        if self.search_count([('state', '=', 'pending')], limit=1):
+            self.env.ref('project_reporting.ir_cron_process_report_jobs')._trigger()
+        return summary
+
+    def _process_report_job(self, dbname, context, job_id):
+        """
+        Render a claimed job in its own transaction and notify the requesting user. Runs in a worker thread.
+
+        Returns:
+            bool: True if the report was rendered
+        """
+        threading.current_thread().dbname = dbname
+        started_at = time.monotonic()
+        try:
+            with self.env.registry.cursor() as cr:
+                job = api.Environment(cr, SUPERUSER_ID, context)[self._name].browse(job_id)
+                attachment = job._render_report()
+                # The job may have been marked as failed meanwhile, after running for too long
+                if not job._lock_running():
+                    _logger.warning("Report jobs: job %s is no longer running, its result is discarded", job_id)
+                    return False
+                job.write({
+                    'state': 'done',
+                    'attachment_id': attachment.id,
+                    'date_done': fields.Datetime.now(),
+                    'duration': time.monotonic() - started_at,
+                })
+                job._notify_user()
+                return True
+        except Exception as error:
+            _logger.exception("Report jobs: job %s failed", job_id)
+            with self.env.registry.cursor() as cr:
+                job = api.Environment(cr, SUPERUSER_ID, context)[self._name].browse(job_id)._lock_running()
+                if not job:
+                    return False
+                job.write({
+                    'state': 'failed',
+                    'error_message': str(error),
+                    'date_done': fields.Datetime.now(),
+                    'duration': time.monotonic() - started_at,
+                })
+                job._notify_user()
+            return False
+
+    def _lock_running(self):
+        """Lock the rows of the jobs still running, and return these jobs"""
+        if not self:
+            return self
+        self.env.cr.execute(f"""
+            SELECT id FROM {self._table}
+            WHERE id IN %s AND state = 'running'
+            FOR UPDATE
+        """, [tuple(self.ids)])
+        running_ids = [row[0] for row in self.env.cr.fetchall()]
+        self.invalidate_recordset(['state'])
+        return self.browse(running_ids)
+
+    def _render_report(self):
+        """Render the report of the job with the rights of the requesting user and return its attachment"""
+        self.ensure_one()
+        return self.update_id.with_user(self.user_id)._get_report_attachment(self.report_type)
+
+    def _notify_user(self):
+        """Notify the requesting users that their reports are ready or failed"""
+        for job in self:
+            if job.state == 'done':
+                job.user_id._bus_send('simple_notification', {
+                    'type': 'success',
+                    'title': "Rapport prêt",
+                    'message': f"{job.display_name} est disponible dans les rapports générés de la mise à jour.",
+                    'sticky': True,
+                })
+            elif job.state == 'failed':
+                job.user_id._bus_send('simple_notification', {
+                    'type': 'danger',
+                    'title': "Échec de la génération du rapport",
+                    'message': f"{job.display_name} : {job.error_message}",
+                    'sticky': True,
+                })
+
+    def action_download(self):
+        """Download the generated report"""
+        self.ensure_one()
+        if not self.attachment_id:
+            return {'type': 'ir.actions.act_window_close'}
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
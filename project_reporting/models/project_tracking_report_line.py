@@ -32,6 +32,10 @@ class ProjectTrackingReportLine(models.Model):
                                           )
     subrequirement_line_id = fields.Many2one('project.subrequirement.line', string='Ligne de sous-exigence', readonly=True,ondelete="cascade")
 
+    # Critical-path analysis of the requirement line
+    is_critical = fields.Boolean(related='requirement_line_id.is_critical', string='Chemin critique')
+    total_float = fields.Integer(related='requirement_line_id.total_float', string='Marge totale (jours)')
+
     # Get the report date from the parent update
     report_date = fields.Datetime(related='project_update_id.report_date',
                                   string='Date du rapport', readonly=True, store=True)
@@ -1,11 +1,22 @@
 import base64
+import hashlib
 import io
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
 
 import xlsxwriter
-from PIL import Image
 
 from odoo import models, fields, api, _
-from .common import PROJECT_STATUS_SELECTION, STANDARD_DEPARTMENT_NAME
+from .common import (
+    PROJECT_STATUS_SELECTION,
+    STANDARD_DEPARTMENT_NAME,
+    TRACKING_REPORT_STREAMING_THRESHOLD,
+    REPORT_ATTACHMENT_RETENTION,
+    REPORT_LAYOUT_VERSION
+)
+from .common_excel import LIGHT_BLUE, FormatRegistry, TrackingReportRow, get_logo_placement
 from ...project_requirement.models.common_dates import (
     get_monday_of_week
 )
@@ -28,6 +39,12 @@ CUSTOM_STATUS_COLOR = {
     False: 0,  # Default grey
 }
 
+# Lines of the update shown in each report
+REPORT_LINE_FIELDS = {
+    'flash': 'project_flash_report_line_ids',
+    'tracking': 'project_tracking_report_line_ids',
+}
+
 # State selection options for project updates
 UPDATE_STATE_SELECTION = [
     ('draft', 'Brouillon'),
@@ -48,6 +65,7 @@ class ProjectUpdate(models.Model):
                                                     string='Lignes de Flash Report')
     project_tracking_report_line_ids = fields.One2many('project.tracking.report.line', 'project_update_id',
                                                        string='Lignes de Suivi Projet')
+    report_job_ids = fields.One2many('project.report.job', 'update_id', string='Rapports générés')
     state = fields.Selection(UPDATE_STATE_SELECTION, string='État', default='draft', tracking=True, copy=False)
 
     # Use report_date as the main date field
@@ -335,10 +353,10 @@ class ProjectUpdate(models.Model):
 
         # Generate reports and get attachment IDs
         attachment_ids = []
-        flash_attachment = self._generate_flash_report_attachment()
+        flash_attachment = self._get_report_attachment('flash')
         if flash_attachment:
             attachment_ids.append(flash_attachment.id)
-        tracking_attachment = self._generate_tracking_report_attachment()
+        tracking_attachment = self._get_report_attachment('tracking')
         if tracking_attachment:
             attachment_ids.append(tracking_attachment.id)
 
@@ -433,116 +451,52 @@ class ProjectUpdate(models.Model):
             raise
 
     def generate_flash_report_pdf(self):
-        """Generate PDF report for the flash report part and return download action."""
-        self.ensure_one()
-        attachment = self._generate_flash_report_attachment()
-        if attachment:
-            return {
-                'type': 'ir.actions.act_url',
-                'url': f'/web/content/{attachment.id}?download=true',
-                'target': 'self',
-            }
-        # Handle error case - maybe return a notification?
-        return {'type': 'ir.actions.act_window_close'}
+        """Queue the generation of the flash report PDF, the user is notified when it is ready."""
+        return self._queue_report('flash')
 
-    def _generate_tracking_report_attachment(self):
-        """Generate Excel report for the tracking report part and return the attachment."""
+    def _generate_tracking_report_attachment(self, streaming=None):
+        """
+        Generate Excel report for the tracking report part and return the attachment.
+
+        The workbook is written to a temporary file, then stored as the attachment content.
+        In streaming mode, used by default for large reports, rows are written in order with
+        xlsxwriter's constant_memory mode so that building the workbook takes a flat amount of memory
+        whatever the number of lines: cells are not merged across rows and department tables are not added.
+        The finished file is still read in memory once to be stored as an attachment.
+
+        Args:
+            streaming: Force (True) or disable (False) the streaming mode, None to decide on the report size
+        """
         self.ensure_one()
+        if streaming is None:
+            streaming = len(self.project_tracking_report_line_ids) > TRACKING_REPORT_STREAMING_THRESHOLD
+
+        report_fd, report_path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(report_fd)
         try:
-            # Define all colors as variables
-            # Main colors
-            PRIMARY_BLUE = '#0b5394'  # Main blue color for headers, requirements, data bars
-            WHITE = '#ffffff'  # White for backgrounds and text
-            # Professional progress bar colors with good contrast for text
-            LIGHT_BLUE = '#b3c6e7'  # Light blue for progress bars
-            SUCCESS_GREEN = '#6aa84f'  # Green for 100% complete values
-
-            # Create a buffer for the Excel file
-            output = io.BytesIO()
-            workbook = xlsxwriter.Workbook(output, {
-                'in_memory': True,
+            # Create the Excel file, rows are flushed to disk as they are written in streaming mode
+            workbook = xlsxwriter.Workbook(report_path, {
+                'constant_memory': streaming,
+                'tmpdir': tempfile.gettempdir(),
                 'default_format_properties': {
                     'font_name': 'Roboto',
                     'valign': 'vcenter'  # Set vertical alignment to center by default
                 }
             })
 
-            # Define workbook formats
-            header_format = workbook.add_format({
-                'bold': True,
-                'align': 'center',
-                'valign': 'vcenter',
-                'font_size': 20,
-                'bg_color': PRIMARY_BLUE,
-                'font_color': WHITE
-            })
-
-            # Header format for the first two columns - white background with blue text
-            table_header_format = workbook.add_format({
-                'bold': True,
-                'align': 'center',
-                'valign': 'vcenter',
-                'bg_color': WHITE,
-                'border': 1,
-                'text_wrap': True,
-                'font_color': PRIMARY_BLUE,
-                'font_size': 13
-            })
-
-            logo_format = workbook.add_format({
-                'bg_color': WHITE,
-                'border': 1,
-                'border_color': 'black'
-            })
-
-            # Header format for columns from Sous-Exigences to Commentaires - blue background with white text
-            table_header_blue_format = workbook.add_format({
-                'bold': True,
-                'align': 'center',
-                'valign': 'vcenter',
-                'bg_color': PRIMARY_BLUE,
-                'border': 1,
-                'text_wrap': True,
-                'font_color': WHITE,
-                'font_size': 13
-            })
-
-            # Department cells with white background and blue text (bold)
-            dept_format = workbook.add_format({
-                'bold': True,
-                'align': 'center',
-                'valign': 'vcenter',
-                'text_wrap': True,
-                'border': 1,
-                'bg_color': WHITE,
-                'font_color': PRIMARY_BLUE,
-                'border_color': 'black',
-                'font_size': 13
-            })
-
-            # Group tracking report lines by lot and then by department
-            lot_department_lines = {}
-
-            # First, gather all lot numbers and sort them
-            lots = set()
-            for line in self.project_tracking_report_line_ids:
-                lot = line.lot_number or "Lot ?"
-                lots.add(lot)
-
-            # Sort lots (alphabetically/numerically)
-            sorted_lots = sorted(list(lots))
+            # Workbook formats, each one is added once and shared by all the cells using it
+            formats = FormatRegistry(workbook)
+            logo_format = formats.get('logo')
+            dept_format = formats.get('department')
 
-            # Group by lot then by department
-            for line in self.project_tracking_report_line_ids:
-                lot = line.lot_number or "Lot ?"
-                if lot not in lot_department_lines:
-                    lot_department_lines[lot] = {}
+            # Logos are resolved once for all the worksheets
+            client_logo, company_logo = self._get_tracking_report_logos()
 
-                department = line.department
-                if department not in lot_department_lines[lot]:
-                    lot_department_lines[lot][department] = []
+            # Tracking report lines grouped by lot, department and requirement
+            lot_groups = self._get_tracking_report_groups()
 
-                lot_department_lines[lot][department].append(line)
+            # Short names of the departments, used for sheet names, titles and tables
+            short_names = {dept.name: dept.short_name for dept in self.department_ids if dept.short_name}
 
             # Create common function to setup worksheet properties
             def setup_worksheet(worksheet, title):
@@ -558,92 +512,50 @@ class ProjectUpdate(models.Model):
                 worksheet.set_column('J:J', 18)  # Date MEP Réelle
                 worksheet.set_column('K:K', 60)  # Commentaires
 
-                # Set row heights
-                worksheet.set_row(0, 16)  # Title row
-                worksheet.set_row(1, 16)  # Title row
-                worksheet.set_row(2, 16)  # Title row
-                worksheet.set_row(3, 20)  # Empty space row
-
-                # Create empty merged cells for logos
-                # Left logo area
-                worksheet.merge_range('A1:A3', '', logo_format)
-
-                # Title spans rows 1-3, from column B to column J
-                worksheet.merge_range('B1:J3', title, header_format)
-
-                # Right logo area
-                worksheet.merge_range('K1:K3', '', logo_format)
-
-                # Add logos to the worksheet
-                # Get the client's company logo (from project's partner)
-                client_logo = None
-                if self.project_id.partner_id:
-                    partner = self.project_id.partner_id
-                    # If partner is a person (not a company), try to get their parent company's logo
-                    if not partner.is_company and partner.parent_id and partner.parent_id.image_1920:
-                        client_logo = partner.parent_id.image_1920
-                    # Otherwise use the partner's logo directly if it's a company
-                    elif partner.is_company and partner.image_1920:
-                        client_logo = partner.image_1920
-                    else:
-                        client_logo = partner.image_1920 if partner.image_1920 else None
-
-                # Get the current company logo
-                company_logo = self.env.company.logo
-
-                def get_image_data_and_scale(image_b64, cell_width, cell_height):
-                    """
-                    Decode a base64 image, return a BytesIO buffer, the scale to fit in the cell, and offsets to center the image.
-                    Args:
-                        image_b64 (str): Base64-encoded image.
-                        cell_width (int): Target cell width in px.
-                        cell_height (int): Target cell height in px.
-                    Returns:
-                        (BytesIO, float, int, int): image_data buffer, scale factor, x_offset, y_offset
-                    """
-                    image_data = io.BytesIO(base64.b64decode(image_b64))
-                    image_data.seek(0)
-                    with Image.open(image_data) as img:
-                        img_width, img_height = img.size
-                    x_scale = min(1.0, cell_width / img_width)
-                    y_scale = min(1.0, cell_height / img_height)
-                    scale = min(x_scale, y_scale)
-                    img_width_scaled = img_width * scale
-                    img_height_scaled = img_height * scale
-                    x_offset = int((cell_width - img_width_scaled) / 2)
-                    y_offset = int((cell_height - img_height_scaled) / 2)
-                    image_data.seek(0)
-                    return image_data, scale, x_offset, y_offset
-
-                # Insert client logo in left cell if available
-                if client_logo:
-                    cell_width_px = 400  # largeur de la cellule fusionnée A1:A3
-                    cell_height_px = 48  # hauteur de la cellule fusionnée A1:A3 (3 x 16)
-                    image_data, scale, x_offset, y_offset = get_image_data_and_scale(client_logo, cell_width_px,
-                                                                                     cell_height_px)
-                    worksheet.insert_image('A1', 'client_logo.png',
-                                           {'image_data': image_data,
-                                            'x_scale': scale, 'y_scale': scale,
-                                            'x_offset': x_offset, 'y_offset': y_offset,
-                                            'object_position': 1})  # Centrage précis de l'image
-
-                # Insert company logo in right cell
-                if company_logo:
-                    cell_width_px = 400  # largeur de la cellule fusionnée K1:K3
-                    cell_height_px = 48  # hauteur de la cellule fusionnée K1:K3 (3 x 16)
-                    image_data, scale, x_offset, y_offset = get_image_data_and_scale(company_logo, cell_width_px,
-                                                                                     cell_height_px)
-                    worksheet.insert_image('K1', 'company_logo.png',
-                                           {'image_data': image_data,
+                if streaming:
+                    # Rows are written in order: the title is a single row as high as the three title rows
+                    worksheet.set_row(0, 48)  # Title row
+                    worksheet.set_row(1, 20)  # Empty space row
+                    worksheet.write_blank(0, 0, None, logo_format)
+                    worksheet.merge_range('B1:J1', title, formats.get('header'))
+                    worksheet.write_blank(0, 10, None, logo_format)
+                else:
+                    # Set row heights
+                    worksheet.set_row(0, 16)  # Title row
+                    worksheet.set_row(1, 16)  # Title row
+                    worksheet.set_row(2, 16)  # Title row
+                    worksheet.set_row(3, 20)  # Empty space row
+
+                    # Create empty merged cells for logos
+                    # Left logo area
+                    worksheet.merge_range('A1:A3', '', logo_format)
+
+                    # Title spans rows 1-3, from column B to column J
+                    worksheet.merge_range('B1:J3', title, formats.get('header'))
+
+                    # Right logo area
+                    worksheet.merge_range('K1:K3', '', logo_format)
+
+                # Insert the client logo in the left cell and the company logo in the right cell
+                for cell, image_name, logo in (('A1', 'client_logo.png', client_logo),
+                                               ('K1', 'company_logo.png', company_logo)):
+                    if not logo:
+                        continue
+                    cell_width_px = 400  # largeur de la cellule fusionnée A1:A3 / K1:K3
+                    cell_height_px = 48  # hauteur de la cellule fusionnée A1:A3 / K1:K3 (3 x 16)
+                    image_data, scale, x_offset, y_offset = get_logo_placement(*logo, cell_width_px, cell_height_px)
+                    worksheet.insert_image(cell, image_name,
+                                           {'image_data': io.BytesIO(image_data),
                                             'x_scale': scale, 'y_scale': scale,
                                             'x_offset': x_offset, 'y_offset': y_offset,
                                             'object_position': 1})  # Centrage précis de l'image
 
                 # Empty separator line
-                worksheet.merge_range('A4:K4', '')
+                separator_row = 1 if streaming else 3
+                worksheet.merge_range(separator_row, 0, separator_row, 10, '')
 
                 # Table headers
-                row = 4  # 0-indexed, so row 5 in Excel
+                row = separator_row + 1  # 0-indexed, so row 5 in Excel (row 3 in streaming mode)
                 worksheet.set_row(row, 45)
                 headers = [
                     'Département', 'Exigences', 'Sous-Exigences',
@@ -654,46 +566,28 @@ class ProjectUpdate(models.Model):
                 for col, header in enumerate(headers):
                     # Use different formats for different columns
                     if col < 2:  # Département and Exigences - white bg with blue text
-                        worksheet.write(row, col, header, table_header_format)
+                        worksheet.write(row, col, header, formats.get('table_header'))
                     else:  # Sous-Exigences to Commentaires - blue bg with white text
-                        worksheet.write(row, col, header, table_header_blue_format)
+                        worksheet.write(row, col, header, formats.get('table_header_blue'))
 
-                return 5  # Return starting row for data
+                return row + 1  # Return starting row for data
 
             # Function to write department data
-            def write_department_data(worksheet, department_name, lines, start_row, add_separator=False):
+            def write_department_data(worksheet, department_name, requirement_groups, start_row, add_separator=False):
                 row = start_row
 
-                # Group lines by requirement
-                requirement_groups = {}
-                for line in lines:
-                    if line.requirement not in requirement_groups:
-                        requirement_groups[line.requirement] = []
-                    requirement_groups[line.requirement].append(line)
-
                 # Department start row
                 department_start_row = row
 
                 # Track total rows for this department
-                total_dept_rows = sum(len(req_group) for req_group in requirement_groups.values())
-
-                # Try to find department object to get short name
-                dept_obj = None
-                for dept in self.department_ids:
-                    if dept.name == department_name:
-                        dept_obj = dept
-                        break
+                total_dept_rows = sum(len(req_lines) for _requirement, req_lines in requirement_groups)
 
                 # Use short name for display if available
-                display_dept_name = dept_obj.short_name if dept_obj and dept_obj.short_name else department_name
+                display_dept_name = short_names.get(department_name) or department_name
 
                 # Process each requirement group to build table data
                 req_group_count = 0
-                for requirement, req_lines in requirement_groups.items():
-                    # Skip requirements with no subrequirements
-                    if not req_lines:
-                        continue
-
+                for requirement, req_lines in requirement_groups:
                     req_start_row = row
                     req_group_count += 1
 
@@ -701,123 +595,59 @@ class ProjectUpdate(models.Model):
                         # Set row height for all data rows
                         worksheet.set_row(row, 23)
 
-                        # Only write department name in the first row of the department
-                        if i == 0 and req_start_row == department_start_row:
-                            # Merge department column for all rows in this department
-                            if total_dept_rows > 0:  # Check before merging
+                        # Cells are written row by row, from left to right, as required by the streaming mode
+                        # Department column
+                        if row == department_start_row:
+                            if streaming:
+                                worksheet.write(row, 0, display_dept_name, dept_format)
+                            elif total_dept_rows > 0:  # Check before merging
+                                # Merge department column for all rows in this department
                                 worksheet.merge_range(department_start_row, 0,
                                                       department_start_row + total_dept_rows - 1, 0,
                                                       display_dept_name, dept_format)
+                        elif streaming:
+                            worksheet.write_blank(row, 0, None, dept_format)
 
                         # Only write requirement in the first row of each requirement group
                         if i == 0:
-                            # Requirement format with thick borders to match the group border style
-                            req_thick_format = workbook.add_format({
-                                'bold': True,
-                                'align': 'center',
-                                'valign': 'vcenter',
-                                'text_wrap': True,
-                                'border': 1,  # Regular border as base
-                                'bg_color': PRIMARY_BLUE,
-                                'font_color': WHITE,
-                                'border_color': 'black',
-                                'font_size': 13
-                            })
-
-                            # Set thick borders
-                            req_thick_format.set_left(2)
-                            req_thick_format.set_right(2)
-                            req_thick_format.set_top(2)
-
                             # For single-row requirements, add bottom border
                             if len(req_lines) == 1:
-                                req_thick_format.set_bottom(2)
+                                req_thick_format = formats.get('requirement', top=2, bottom=2)
                                 worksheet.write(req_start_row, 1, requirement, req_thick_format)
+                            elif streaming:
+                                worksheet.write(req_start_row, 1, requirement, formats.get('requirement', top=2))
                             else:
                                 # For multi-row requirements
                                 # First apply the merge with the top format
                                 worksheet.merge_range(req_start_row, 1, req_start_row + len(req_lines) - 1, 1,
-                                                      requirement, req_thick_format)
-
-                                # Then create the bottom format with all the same properties plus thick bottom
-                                bottom_req_format = workbook.add_format({
-                                    'bold': True,
-                                    'align': 'center',
-                                    'valign': 'vcenter',
-                                    'text_wrap': True,
-                                    'border': 1,
-                                    'bg_color': PRIMARY_BLUE,
-                                    'font_color': WHITE,
-                                    'border_color': 'black',
-                                    'font_size': 13,
-                                    'bottom': 2,
-                                    'left': 2,
-                                    'right': 2
-                                })
-
-                                # Apply the bottom format (this won't affect the displayed text from the merge)
-                                worksheet.write(req_start_row + len(req_lines) - 1, 1, '', bottom_req_format)
+                                                      requirement, formats.get('requirement', top=2))
+
+                        # Close the requirement group on its last row with a thick bottom border
+                        elif i == len(req_lines) - 1:
+                            # Apply the bottom format (this won't affect the displayed text from the merge)
+                            worksheet.write(row, 1, '', formats.get('requirement', bottom=2))
+
+                        # Rows inside the requirement group, covered by the merge when not streaming
+                        elif streaming:
+                            worksheet.write_blank(row, 1, None, formats.get('requirement_middle'))
 
                         # Determine border properties based on position
                         is_first_row = (i == 0)
                         is_last_row = (i == len(req_lines) - 1)
 
-                        # Dynamically create formats with appropriate borders based on position
-                        # Create new format objects with the same properties as the base formats
-
-                        # For the first column (subrequirement)
-                        subrequirement_format = workbook.add_format({
-                            'border': 1,
-                            'border_color': 'black',
-                            'font_color': PRIMARY_BLUE
-                        })
-                        if is_first_row:
-                            subrequirement_format.set_top(2)  # Thick top border for first row
-                        if is_last_row:
-                            subrequirement_format.set_bottom(2)  # Thick bottom border for last row
-                        subrequirement_format.set_left(2)  # Always thick left border as this is leftmost column
-
-                        # For percentage columns (columns 3-5)
-                        percentage_cell_format = workbook.add_format({
-                            'border': 1,
-                            'border_color': 'black',
-                            'num_format': '0%',
-                            'font_color': PRIMARY_BLUE,
-                            'font_size': 10,
-                            'align': 'center'
-                        })
-                        if is_first_row:
-                            percentage_cell_format.set_top(2)  # Thick top border for first row
-                        if is_last_row:
-                            percentage_cell_format.set_bottom(2)  # Thick bottom border for last row
-
-                        # For date columns (columns 6-7)
-                        date_cell_format = workbook.add_format({
-                            'border': 1,
-                            'border_color': 'black',
-                            'num_format': 'dd/mm/yyyy',
-                            'font_color': PRIMARY_BLUE,
-                            'font_size': 10,
-                            'align': 'center'
-                        })
-                        if is_first_row:
-                            date_cell_format.set_top(2)  # Thick top border for first row
-                        if is_last_row:
-                            date_cell_format.set_bottom(2)  # Thick bottom border for last row
-
-                        # For the last column (comments)
-                        comment_format = workbook.add_format({
-                            'border': 1,
-                            'border_color': 'black',
-                            'font_color': PRIMARY_BLUE
-                        })
+                        # Thick top border for first row and thick bottom border for last row
+                        borders = {}
                         if is_first_row:
-                            comment_format.set_top(2)  # Thick top border for first row
+                            borders['top'] = 2
                         if is_last_row:
-                            comment_format.set_bottom(2)  # Thick bottom border for last row
-                        comment_format.set_right(2)  # Always thick right border as this is rightmost column
+                            borders['bottom'] = 2
 
-                        # Write cells with dynamically created formats
+                        subrequirement_format = formats.get('subrequirement', **borders)
+                        percentage_cell_format = formats.get('percentage', **borders)
+                        date_cell_format = formats.get('date', **borders)
+                        comment_format = formats.get('comment', **borders)
+
+                        # Write cells with the formats of their position in the group
                         worksheet.write(row, 2, line.subrequirement or "", subrequirement_format)
                         worksheet.write(row, 3, line.design_implementation_percentage / 100, percentage_cell_format)
                         worksheet.write(row, 4, line.validation_percentage / 100, percentage_cell_format)
@@ -835,17 +665,14 @@ class ProjectUpdate(models.Model):
                         row += 1
 
                 # Create a sanitized table name from department name (remove spaces, special chars)
-                # Try to find department object to get short name
-                dept_obj = None
-                for dept in self.department_ids:
-                    if dept.name == department_name:
-                        dept_obj = dept
-                        break
-
                 # Use short name for table name if available
-                name_for_table = dept_obj.short_name if dept_obj and dept_obj.short_name else department_name
+                name_for_table = display_dept_name
                 table_name = "Table" + ''.join(c for c in name_for_table if c.isalnum())
 
+                # Tables are not available in constant_memory mode
+                if streaming:
+                    return row
+
                 # Add table with named style
                 worksheet.add_table(f'C{start_row + 1}:K{start_row + total_dept_rows}', {
                     'header_row': False,
@@ -886,12 +713,7 @@ class ProjectUpdate(models.Model):
                     })
 
                     # Special formatting for 100% values
-                    complete_format = workbook.add_format({
-                        'bold': True,
-                        'font_color': PRIMARY_BLUE,
-                        'num_format': '0%',
-                        'align': 'center'
-                    })
+                    complete_format = formats.get('complete')
 
                     worksheet.conditional_format(f'{col_letter}{first_data_row}:{col_letter}{last_data_row}', {
                         'type': 'cell',
@@ -901,19 +723,12 @@ class ProjectUpdate(models.Model):
                     })
 
             # Create worksheets based on lot and department order
-            # Process lots in sorted order
-            for lot in sorted_lots:
+            # Lots are in sorted order
+            for lot, department_groups in lot_groups:
                 # For each lot, create a sheet for each department
-                for department_name, lines in lot_department_lines[lot].items():
-                    # Get department short name if available
-                    department_obj = None
-                    for dept in self.department_ids:
-                        if dept.name == department_name:
-                            department_obj = dept
-                            break
-
+                for department_name, requirement_groups in department_groups:
                     # Use short name if available, otherwise use full name for sheet name
-                    sheet_name = department_obj.short_name if department_obj and department_obj.short_name else department_name
+                    sheet_name = short_names.get(department_name) or department_name
 
                     # Truncate sheet name to 31 characters (Excel limitation)
                     sheet_name = sheet_name[:31]
@@ -922,7 +737,7 @@ class ProjectUpdate(models.Model):
                     worksheet = workbook.add_worksheet(sheet_name)
 
                     # Use short name in title if available
-                    display_name = department_obj.short_name if department_obj and department_obj.short_name else department_name
+                    display_name = short_names.get(department_name) or department_name
 
                     # Handle "Lot ?" differently in the title
                     if lot == "Lot ?":
@@ -933,48 +748,243 @@ class ProjectUpdate(models.Model):
                     start_row = setup_worksheet(worksheet, title)  # start_row is 1-based Excel row
 
                     # Write data
-                    last_row = write_department_data(worksheet, department_name, lines,
+                    last_row = write_department_data(worksheet, department_name, requirement_groups,
                                                      start_row)  # last_row is the next available 1-based Excel row
 
                     # Add conditional formatting - make sure to include the last actual data row
                     if last_row > start_row:
                         add_conditional_formatting(worksheet, start_row + 1, last_row)
 
-            # Close workbook and get the file data
+            # Close workbook, the file is complete on disk
             workbook.close()
-            output.seek(0)
 
             # Create the attachment
             # Replace slashes with hyphens in the name specifically for the filename
             filename_safe_name = self.name.replace('/', '-')
             filename = f"Suivi Projet - {filename_safe_name}.xlsx"
-            attachment = self.env['ir.attachment'].create({
-                'name': filename,
-                'datas': base64.b64encode(output.getvalue()),
-                'res_model': self._name,
-                'res_id': self.id,
-                'type': 'binary',
-                'mimetype': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            })
+            return self._create_attachment_from_file(
+                filename, report_path, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+        finally:
+            os.remove(report_path)
 
-            return attachment
-        except Exception as e:
-            # Re-raise the exception so it's not swallowed silently
-            raise
+    def _get_tracking_report_groups(self):
+        """
+        Return the tracking report lines grouped by lot, department and requirement.
+
+        The columns of all the lines are read at once, then grouped with a single sort: lots are sorted,
+        departments keep the order of the lines and requirements the order of their first line.
+
+        Returns:
+            list: (lot, [(department, [(requirement, [TrackingReportRow, ...]), ...]), ...]) tuples
+        """
+        self.ensure_one()
+        columns = list(TrackingReportRow._fields)
+
+        # Sort key of each row: lot, position of the first line of its requirement group, own position
+        first_positions = {}
+        keyed_rows = []
+        for position, values in enumerate(self.project_tracking_report_line_ids.read(columns)):
+            row = TrackingReportRow(*(values[column] for column in columns))
+            lot = row.lot_number or "Lot ?"
+            first_position = first_positions.setdefault((lot, row.department, row.requirement), position)
+            keyed_rows.append((lot, first_position, position, row))
+        keyed_rows.sort(key=itemgetter(0, 1, 2))
+
+        lot_groups = []
+        for lot, lot_rows in groupby(keyed_rows, key=itemgetter(0)):
+            department_groups = []
+            for department, department_rows in groupby(lot_rows, key=lambda keyed_row: keyed_row[3].department):
+                requirement_groups = []
+                for _first_position, requirement_rows in groupby(department_rows, key=itemgetter(1)):
+                    rows = [keyed_row[3] for keyed_row in requirement_rows]
+                    requirement_groups.append((rows[0].requirement, rows))
+                department_groups.append((department, requirement_groups))
+            lot_groups.append((lot, department_groups))
+        return lot_groups
+
+    def _get_tracking_report_logos(self):
+        """
+        Return the client and company logos of the tracking report.
+        Each logo is a (checksum, loader) pair, None when there is no logo: the images are only read and
+        decoded when they are not cached yet.
+        """
+        self.ensure_one()
+        company_partner = self._get_report_company().partner_id
+        client_partner = self.project_id.partner_id
+        partners = company_partner | client_partner | client_partner.parent_id
+
+        # Partner images are attachments, their checksum identifies the image content
+        attachments = self.env['ir.attachment'].sudo().search_fetch([
+            ('res_model', '=', 'res.partner'),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', partners.ids),
+        ], ['res_id', 'checksum'])
+        checksums = {attachment.res_id: attachment.checksum for attachment in attachments}
+
+        def get_logo(partner):
+            checksum = checksums.get(partner.id)
+            return (checksum, lambda: partner.image_1920) if checksum else None
+
+        # Get the client's company logo (from project's partner)
+        client_logo = None
+        if client_partner:
+            # If partner is a person (not a company), try to get their parent company's logo
+            if not client_partner.is_company and checksums.get(client_partner.parent_id.id):
+                client_logo = get_logo(client_partner.parent_id)
+            # Otherwise use the partner's logo directly
+            else:
+                client_logo = get_logo(client_partner)
+
+        # The company logo is the image of the company partner
+        return client_logo, get_logo(company_partner)
+
+    def _create_attachment_from_file(self, filename, file_path, mimetype):
+        """
+        Create an attachment of the update from a file on disk.
+        The content is read in memory and passed as raw bytes, the only content ir.attachment keeps on create:
+        the attachment model stores it, in the database or the filestore, and computes its checksum and size.
+        """
+        self.ensure_one()
+        with open(file_path, 'rb') as source:
+            raw = source.read()
+        return self.env['ir.attachment'].create({
+            'name': filename,
+            'res_model': self._name,
+            'res_id': self.id,
+            'type': 'binary',
+            'mimetype': mimetype,
+            'raw': raw,
+        })
 
     def generate_tracking_report_excel(self):
-        """Generate Excel report for the tracking report part and return download action."""
+        """Queue the generation of the tracking report Excel, the user is notified when it is ready."""
+        return self._queue_report('tracking')
+
+    def _queue_report(self, report_type):
+        """
+        Queue the generation of a report in the background and return a notification action.
+        A report whose content did not change since its last generation is downloaded right away.
+        """
         self.ensure_one()
-        attachment = self._generate_tracking_report_attachment()
+        attachment = self._get_cached_report_attachment(report_type, self._get_report_fingerprint(report_type))
         if attachment:
-            # Return action to download the report
             return {
                 'type': 'ir.actions.act_url',
                 'url': f'/web/content/{attachment.id}?download=true',
                 'target': 'self',
             }
-        # Handle error case - maybe return a notification?
-        return {'type': 'ir.actions.act_window_close'}
+
+        job, created = self.env['project.report.job']._enqueue(self, report_type)
+        if created:
+            message = f"{job.display_name} est en cours de génération, vous serez notifié lorsqu'il sera prêt."
+        else:
+            message = f"{job.display_name} est déjà en cours de génération."
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'info',
+                'title': "Génération du rapport",
+                'message': message,
+                'sticky': False,
+            },
+        }
+
+    def _get_report_fingerprint(self, report_type):
+        """
+        Return the fingerprint of the content of a report of the update.
+        It changes whenever the update, its report lines, the project records shown in the report or the
+        report layout are modified.
+        """
+        self.ensure_one()
+        self.env.flush_all()
+
+        # Report lines can be numerous: their ids and write dates are hashed by the database
+        lines_model = self.env[self._fields[REPORT_LINE_FIELDS[report_type]].comodel_name]
+        self.env.cr.execute(f"""
+            SELECT md5(string_agg(id::text || ':' || write_date::text, ',' ORDER BY id))
+            FROM {lines_model._table}
+            WHERE project_update_id = %s
+        """, [self.id])
+        signature = [report_type, str(REPORT_LAYOUT_VERSION), self.env.lang or '', self.env.cr.fetchone()[0] or '']
+
+        # Records shown in the reports besides the lines: lots, departments, client and company logos
+        company = self._get_report_company()
+        partners = self.project_id.partner_id | self.project_id.partner_id.parent_id | company.partner_id
+        for records in (self, self.project_id, self.project_id.lot_ids, self.department_ids, company, partners):
+            signature.extend(f"{record._name}:{record.id}:{record.write_date}" for record in records)
+
+        return hashlib.sha1('|'.join(signature).encode()).hexdigest()
+
+    def _get_report_company(self):
+        """Return the company the reports of the update are rendered for, whoever generates them"""
+        self.ensure_one()
+        return self.project_id.company_id or self.env.company
+
+    def _get_report_attachments_domain(self, report_type):
+        """Domain of the generated attachments of a report of the update"""
+        return [
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('project_report_type', '=', report_type),
+        ]
+
+    def _get_cached_report_attachment(self, report_type, fingerprint):
+        """Return the attachment already generated for a report with the same content, if any"""
+        self.ensure_one()
+        return self.env['ir.attachment'].search(
+            self._get_report_attachments_domain(report_type) + [('project_report_fingerprint', '=', fingerprint)],
+            order='id desc', limit=1)
+
+    def _get_report_attachment(self, report_type):
+        """
+        Return the attachment of a report of the update, only rendered again when its content changed
+        since the last generation. Superseded attachments beyond the retention are garbage collected.
+        """
+        self.ensure_one()
+        fingerprint = self._get_report_fingerprint(report_type)
+        attachment = self._get_cached_report_attachment(report_type, fingerprint)
+        if attachment:
+            return attachment
+
+        # The report shows the logo of the project's company, not the one of the current user
+        update = self.with_company(self._get_report_company())
+        if report_type == 'flash':
+            attachment = update._generate_flash_report_attachment()
+        else:
+            attachment = update._generate_tracking_report_attachment()
+        attachment.write({'project_report_type': report_type, 'project_report_fingerprint': fingerprint})
+
+        self._gc_report_attachments(report_type)
+        return attachment
+
+    def _gc_report_attachments(self, report_type):
+        """
+        Delete the generated attachments of a report beyond the REPORT_ATTACHMENT_RETENTION most recent ones.
+        Attachments of sent messages are kept.
+        """
+        self.ensure_one()
+        Attachment = self.env['ir.attachment'].sudo()
+        superseded = Attachment.search(self._get_report_attachments_domain(report_type),
+                                       order='id desc', offset=REPORT_ATTACHMENT_RETENTION)
+        if not superseded:
+            return
+
+        messages = self.env['mail.message'].sudo().search([('attachment_ids', 'in', superseded.ids)])
+        (superseded - messages.attachment_ids).unlink()
+
+    def action_open_report_jobs(self):
+        """Open the reports generated for the update."""
+        self.ensure_one()
+        return {
+            'name': 'Rapports générés',
+            'type': 'ir.actions.act_window',
+            'res_model': 'project.report.job',
+            'view_mode': 'list',
+            'domain': [('update_id', '=', self.id)],
+            'context': {'create': False},
+            'target': 'current',
+        }
 
     def generate_flash_lines(self, last_update=None):
         """
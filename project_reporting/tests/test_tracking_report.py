@@ -0,0 +1,46 @@
+import io
+import zipfile
+
+from odoo.tests.common import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestTrackingReport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.project = cls.env['project.project'].create({'name': 'Projet rapport de suivi'})
+        cls.update = cls.env['project.update'].with_context(wizard_creating_update=True).create({
+            'project_id': cls.project.id,
+        })
+        cls.env['project.tracking.report.line'].create([{
+            'project_update_id': cls.update.id,
+            'lot_number': lot,
+            'department': department,
+            'requirement': f'Exigence {index // 2}',
+            'subrequirement': f'Sous-exigence {index}',
+            'design_implementation_percentage': 100 if index % 3 else 50,
+            'comments': 'Commentaire',
+        } for lot, department in (('Lot 1', 'Finance'), ('Lot 2', 'Achats')) for index in range(6)])
+
+    def _assert_valid_xlsx(self, attachment):
+        raw = attachment.raw
+        self.assertTrue(raw, "The report attachment has no content")
+        self.assertEqual(attachment.file_size, len(raw))
+        with zipfile.ZipFile(io.BytesIO(raw)) as workbook:
+            self.assertIsNone(workbook.testzip())
+            self.assertIn('xl/workbook.xml', workbook.namelist())
+
+    def test_tracking_report_attachment(self):
+        attachment = self.update._generate_tracking_report_attachment(streaming=False)
+        self._assert_valid_xlsx(attachment)
+
+    def test_tracking_report_attachment_streaming(self):
+        attachment = self.update._generate_tracking_report_attachment(streaming=True)
+        self._assert_valid_xlsx(attachment)
+
+    def test_tracking_report_attachment_reused(self):
+        attachment = self.update._get_report_attachment('tracking')
+        self._assert_valid_xlsx(attachment)
+        self.assertEqual(self.update._get_report_attachment('tracking'), attachment)
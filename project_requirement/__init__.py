@@ -4,7 +4,7 @@ from . import wizards
 
 def post_init_hook(env):
     """
-    Post-init hook to ensure the generic department exists.
+    Post-init hook to ensure the generic department exists and the complexities follow the thresholds.
     This is called when the module is installed.
     """
     from .models.common_projects import get_generic_department
@@ -12,3 +12,6 @@ def post_init_hook(env):
     # env = api.Environment(cr, SUPERUSER_ID, {})
     # Ensure generic department exists
     get_generic_department(env)
+
+    # Record the complexity thresholds the stored complexities follow
+    env['project.project']._realign_complexity_thresholds()
@@ -9,13 +9,14 @@
     'website': "https://www.progistack.com",
 
     'category': 'Project',
-    'version': '0.2',
+    'version': '0.4',
     'depends': ['base', 'analytic', 'project', 'contacts', 'hr', 'mail', 'sale', 'crm', 'sale_crm', 'sale_project',
                 'hr_timesheet'],
     'data': [
         'security/ir.model.access.csv',
         "security/security.xml",
         'data/project_data.xml',
+        'data/ir_cron_data.xml',
         'views/project_department_views.xml',
         'views/project_requirement_views.xml',
         'views/project_subrequirement_views.xml',
@@ -33,6 +34,7 @@
         'views/crm_lead_views.xml',
         'views/hr_timesheet_views.xml',
         'wizards/project_requirement_selection_views.xml',
+        'wizards/project_schedule_simulation_views.xml',
         'views/project_menus.xml',
     ],
     'assets': {
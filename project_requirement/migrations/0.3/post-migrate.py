@@ -0,0 +1,23 @@
+def migrate(cr, version):
+    """
+    Link the legacy tasks generated from a requirement, but without a requirement line reference,
+    to the matching requirement line of their project.
+    When several lines of the project share the requirement, the first one in schedule order is used,
+    like the fallback of the task allocated hours.
+    """
+    if not version:
+        return
+
+    cr.execute("""
+        UPDATE project_task AS task
+           SET requirement_line_id = line.id
+          FROM (
+                SELECT DISTINCT ON (project_id, requirement_id) id, project_id, requirement_id
+                  FROM project_requirement_line
+              ORDER BY project_id, requirement_id, "order", planned_end_date, id
+               ) AS line
+         WHERE task.requirement_line_id IS NULL
+           AND task.custom_requirement_line_id IS NULL
+           AND task.project_id = line.project_id
+           AND task.requirement_id = line.requirement_id
+    """)
@@ -0,0 +1,13 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """
+    Realign the stored complexity of the subrequirements and subrequirement lines with the current
+    thresholds, instead of checking them on the first project save.
+    """
+    if not version:
+        return
+
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['project.project']._realign_complexity_thresholds()
@@ -1,6 +1,8 @@
+from . import common_cache
 from . import common_dates
 from . import common_projects
 from . import common_requirements
+from . import common_schedule
 from . import crm_lead
 from . import hr_job
 from . import project
@@ -16,3 +18,5 @@ from . import project_requirement_line
 from . import project_subrequirement
 from . import project_subrequirement_line
 from . import project_task
+from . import res_company
+from . import resource_calendar_leaves
@@ -0,0 +1,35 @@
+"""
+Common utilities for the versioned caches of the module.
+This module centralizes the version counters added to the keys of ormcached builders: bumping a
+version makes every worker rebuild the cached value on its next read, while the other caches of the
+registry are kept.
+"""
+
+import uuid
+
+WORKING_DAY_INDEX_VERSION_KEY = 'project_requirement.working_day_index_version.%s'
+CATALOGUE_VERSION_KEY = 'project_requirement.catalogue_version'
+
+
+def get_cache_version(cr, key):
+    """
+    Return the current version of a cache, False if it was never bumped.
+
+    The versions are system parameters read and written in SQL: going through ir.config_parameter
+    would clear all the registry caches on each bump.
+    """
+    cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", [key])
+    row = cr.fetchone()
+    return row[0] if row else False
+
+
+def bump_cache_version(cr, key):
+    """
+    Give a cache a new version, so that the values cached with the previous one are no longer read.
+    Versions are unique: a value cached by a transaction that is rolled back can never be read again.
+    """
+    cr.execute("""
+        INSERT INTO ir_config_parameter (key, value, create_date, write_date)
+        VALUES (%s, %s, NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC')
+        ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, write_date = EXCLUDED.write_date
+    """, [key, uuid.uuid4().hex])
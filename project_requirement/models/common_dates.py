@@ -3,7 +3,9 @@ Common date validation and manipulation utilities.
 This module centralizes date-related functionality used across the application.
 """
 
-from datetime import timedelta
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
 from math import ceil
 
 from dateutil.relativedelta import relativedelta, MO
@@ -68,110 +70,261 @@ def get_monday_of_week(date=None):
 
 # Business day utility functions
 
-def is_business_day(dt):
-    """Check if a date is a business day (Monday to Friday)."""
-    from odoo import fields
+# Days to add to reach a business day, indexed by weekday (0 is Monday)
+_DAYS_TO_BUSINESS_DAY = (0, 0, 0, 0, 0, 2, 1)
+# Days to add to reach the next business day, indexed by weekday (0 is Monday)
+_DAYS_TO_NEXT_BUSINESS_DAY = (1, 1, 1, 1, 3, 2, 1)
+
+
+def _to_date(dt):
+    """Convert a date string to a date, leaving date objects untouched."""
+    if isinstance(dt, str):
+        from odoo import fields
+        return fields.Date.from_string(dt)
+    return dt
+
 
+def is_business_day(dt, calendar=None):
+    """
+    Check if a date is a business day (Monday to Friday).
+    When a WorkingDayIndex is given, its holidays are not business days either.
+    """
     if not dt:
         return False
 
-    if isinstance(dt, str):
-        dt = fields.Date.from_string(dt)
+    if calendar:
+        return calendar.is_business_day(_to_date(dt))
 
     # 0-4 are Monday to Friday, 5-6 are Saturday and Sunday
-    return dt.weekday() < 5
+    return _to_date(dt).weekday() < 5
 
 
-def ensure_business_day(dt):
+def ensure_business_day(dt, calendar=None):
     """
     Ensure a date is a business day.
     If it's a weekend (Saturday or Sunday), move it to the next Monday.
     If it's already a business day (Monday to Friday), return it unchanged.
+    When a WorkingDayIndex is given, holidays are skipped as well.
     """
-    from odoo import fields
-
     if not dt:
         return dt
 
-    if isinstance(dt, str):
-        dt = fields.Date.from_string(dt)
+    dt = _to_date(dt)
+    if calendar:
+        return calendar.ensure_business_day(dt)
 
-    # If it's Saturday (5) or Sunday (6), move to next Monday
-    if dt.weekday() >= 5:  # Weekend
-        # Add days needed to reach Monday
-        days_to_add = 7 - dt.weekday() if dt.weekday() == 6 else 2
-        return dt + timedelta(days=days_to_add)
-    return dt
+    days_to_add = _DAYS_TO_BUSINESS_DAY[dt.weekday()]
+    return dt + timedelta(days=days_to_add) if days_to_add else dt
 
 
-def get_next_business_day(dt):
+def get_next_business_day(dt, calendar=None):
     """
     Get the next business day after the given date.
     
     - For Monday-Thursday: returns the next day
     - For Friday: returns the following Monday (skipping weekend)
     - For Saturday/Sunday: returns the following Monday
+    When a WorkingDayIndex is given, holidays are skipped as well.
     """
-    from odoo import fields
-
     if not dt:
         return dt
 
-    if isinstance(dt, str):
-        dt = fields.Date.from_string(dt)
-
-    # First, always advance one day
-    next_dt = dt + timedelta(days=1)
-
-    # If the next day falls on a weekend, skip to Monday
-    if next_dt.weekday() >= 5:  # Weekend (5=Sat, 6=Sun)
-        # For Saturday (5): add 2 days to reach Monday
-        # For Sunday (6): add 1 day to reach Monday (7-6=1)
-        days_to_add = 7 - next_dt.weekday() if next_dt.weekday() == 6 else 2
-        return next_dt + timedelta(days=days_to_add)
+    dt = _to_date(dt)
+    if calendar:
+        return calendar.get_next_business_day(dt)
 
-    # Already a business day
-    return next_dt
+    return dt + timedelta(days=_DAYS_TO_NEXT_BUSINESS_DAY[dt.weekday()])
 
 
-def add_working_days(start_date, working_days):
+def add_working_days(start_date, working_days, calendar=None):
     """
     Add a specified number of working days to a date, skipping weekends.
-    Counts the start date itself as day 1 of work.
+    Counts the start date itself as day 1 of work, even when it falls on a weekend.
+    Runs in constant time using week/remainder arithmetic.
     
     Args:
         start_date: The starting date
         working_days: Number of working days to add
+        calendar: Optional WorkingDayIndex whose holidays are skipped as well
         
     Returns:
         date: The date after adding the specified number of working days
     """
-    from odoo import fields
-
     if not start_date:
         return start_date
 
-    if isinstance(start_date, str):
-        start_date = fields.Date.from_string(start_date)
+    start_date = _to_date(start_date)
 
     # Handle 0 or negative working days
     if working_days <= 0:
         return start_date
 
-    # Start with the initial date - it counts as day 1
-    result_date = start_date
-    days_counted = 1
+    # The start date is day 1, the remaining days are weekdays strictly after it
+    remaining_days = ceil(working_days) - 1
+    if remaining_days <= 0:
+        return start_date
+
+    if calendar:
+        return calendar.add_working_days(start_date, remaining_days)
+
+    # Weekdays following a weekend day are the same as those following the Friday before it
+    weekday = start_date.weekday()
+    if weekday > 4:
+        start_date -= timedelta(days=weekday - 4)
+        weekday = 4
+
+    # Every 5 working days is a full week, the remainder may cross one weekend
+    weeks, remainder = divmod(remaining_days, 5)
+    days_to_add = weeks * 7 + remainder
+    if weekday + remainder > 4:
+        days_to_add += 2
 
-    # Keep adding days until we reach the target working days
-    while days_counted < working_days:
-        # Move to next day
-        result_date += timedelta(days=1)
+    return start_date + timedelta(days=days_to_add)
 
-        # Only count weekdays (Monday to Friday)
-        if result_date.weekday() < 5:
-            days_counted += 1
 
-    return result_date
+def _count_weekdays_through(dt):
+    """Count the weekdays from 0001-01-01 (a Monday) up to and including the given date."""
+    days = dt.toordinal() - 1
+    return 5 * (days // 7) + min(days % 7 + 1, 5)
+
+
+def count_working_days(start_date, end_date, calendar=None):
+    """
+    Count the working days after start_date, up to and including end_date.
+    Returns 0 when end_date is not after start_date.
+
+    Args:
+        start_date: The starting date (excluded)
+        end_date: The ending date (included)
+        calendar: Optional WorkingDayIndex whose holidays are not counted
+    """
+    if not start_date or not end_date:
+        return 0
+
+    start_date = _to_date(start_date)
+    end_date = _to_date(end_date)
+    if end_date <= start_date:
+        return 0
+
+    if calendar:
+        return calendar.count_working_days(start_date, end_date)
+    return _count_weekdays_through(end_date) - _count_weekdays_through(start_date)
+
+
+def add_working_days_batch(start_dates, working_days, calendar=None):
+    """
+    Apply add_working_days to each start date and number of working days.
+
+    Args:
+        start_dates: Sequence of starting dates, or a single date shared by all durations
+        working_days: Sequence of working days to add
+        calendar: Optional WorkingDayIndex whose holidays are skipped as well
+
+    Returns:
+        list: The dates after adding each number of working days to its start date
+    """
+    if not isinstance(start_dates, (list, tuple)):
+        start_dates = [start_dates] * len(working_days)
+
+    if len(start_dates) != len(working_days):
+        raise ValueError("start_dates and working_days must have the same length")
+
+    return [add_working_days(start_date, days, calendar=calendar)
+            for start_date, days in zip(start_dates, working_days)]
+
+
+class WorkingDayIndex:
+    """
+    Sorted index of the working days (Monday to Friday, minus holidays) over a date range.
+
+    Business-day offsets within the range are binary-search lookups on the index.
+    Dates beyond the range fall back to the Monday to Friday arithmetic.
+    """
+
+    def __init__(self, holidays, first_date, last_date):
+        """
+        Args:
+            holidays: Iterable of non-working dates
+            first_date: First date covered by the index
+            last_date: Last date covered by the index
+        """
+        holiday_ordinals = {holiday.toordinal() for holiday in holidays}
+        self.first_ordinal = first_date.toordinal()
+        self.last_ordinal = last_date.toordinal()
+
+        # Ordinal 1 (0001-01-01) is a Monday, so (ordinal - 1) % 7 is the weekday
+        self.working_days = array('l', (
+            ordinal for ordinal in range(self.first_ordinal, self.last_ordinal + 1)
+            if (ordinal - 1) % 7 < 5 and ordinal not in holiday_ordinals
+        ))
+
+    def _covers(self, dt):
+        """Check if a date is within the indexed range"""
+        return self.first_ordinal <= dt.toordinal() <= self.last_ordinal
+
+    def _get_working_day(self, position):
+        """Return the working day at the given index position, or None when it is out of range"""
+        if position < len(self.working_days):
+            return date.fromordinal(self.working_days[position])
+        return None
+
+    def is_business_day(self, dt):
+        """Check if a date is a working day"""
+        if not self._covers(dt):
+            return is_business_day(dt)
+        ordinal = dt.toordinal()
+        position = bisect_left(self.working_days, ordinal)
+        return position < len(self.working_days) and self.working_days[position] == ordinal
+
+    def ensure_business_day(self, dt):
+        """Return the date itself if it is a working day, otherwise the next working day"""
+        if not self._covers(dt):
+            business_day = ensure_business_day(dt)
+            # A weekend just before the indexed range may end on a holiday
+            if dt.toordinal() < self.first_ordinal <= business_day.toordinal():
+                return self.ensure_business_day(business_day)
+            return business_day
+        working_day = self._get_working_day(bisect_left(self.working_days, dt.toordinal()))
+        return working_day or ensure_business_day(date.fromordinal(self.last_ordinal + 1))
+
+    def get_next_business_day(self, dt):
+        """Return the first working day strictly after the date"""
+        return self.ensure_business_day(dt + timedelta(days=1))
+
+    def count_working_days(self, start_date, end_date):
+        """Count the working days after start_date, up to and including end_date"""
+        start_ordinal = start_date.toordinal()
+        end_ordinal = end_date.toordinal()
+        count = bisect_right(self.working_days, end_ordinal) - bisect_right(self.working_days, start_ordinal)
+
+        # Dates outside the indexed range only skip weekends
+        if start_ordinal < self.first_ordinal - 1:
+            count += count_working_days(start_date, date.fromordinal(min(end_ordinal, self.first_ordinal - 1)))
+        if end_ordinal > self.last_ordinal:
+            count += count_working_days(date.fromordinal(max(start_ordinal, self.last_ordinal)), end_date)
+        return count
+
+    def add_working_days(self, start_date, remaining_days):
+        """Return the date of the remaining_days-th working day strictly after start_date"""
+        start_ordinal = start_date.toordinal()
+        if start_ordinal > self.last_ordinal:
+            return add_working_days(start_date, remaining_days + 1)
+
+        position = bisect_right(self.working_days, start_ordinal) + remaining_days - 1
+
+        # Dates before the indexed range only skip weekends
+        if start_ordinal < self.first_ordinal:
+            days_before_index = count_working_days(start_date, date.fromordinal(self.first_ordinal - 1))
+            if remaining_days <= days_before_index:
+                return add_working_days(start_date, remaining_days + 1)
+            position -= days_before_index
+
+        if position < len(self.working_days):
+            return date.fromordinal(self.working_days[position])
+
+        # Continue past the end of the index with the Monday to Friday arithmetic
+        days_after_index = position - len(self.working_days) + 1
+        return add_working_days(date.fromordinal(self.last_ordinal), days_after_index + 1)
 
 
 def adjust_duration_by_workforce(estimated_work_days, workforce_factor):
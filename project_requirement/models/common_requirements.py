@@ -25,6 +25,15 @@ COMPLEXITY_TO_DAYS = {
     'complex': 10
 }
 
+# Complexity thresholds on the estimated days, checked in order: (bound, bound included, complexity)
+# The stored complexities are realigned by a migration when they change, see Project._realign_complexity_thresholds
+COMPLEXITY_THRESHOLDS = (
+    (1, False, 'none'),
+    (3, True, 'simple'),
+    (9, True, 'medium'),
+)
+COMPLEXITY_ABOVE_THRESHOLDS = 'complex'
+
 PROJECT_TYPE_SELECTION = [
     ('etude_chiffrage', 'Etude et chiffrage'),
     ('implementation', 'Implémentation'),
@@ -40,14 +49,39 @@ SUBREQUIREMENT_TYPE_SELECTION = [
 
 def get_complexity_from_days(days):
     """Determine complexity level based on estimated days value"""
-    if days < 1:
-        return 'none'
-    elif days <= 3:
-        return 'simple'
-    elif days <= 9:
-        return 'medium'
-    else:
-        return 'complex'
+    for bound, bound_included, complexity in COMPLEXITY_THRESHOLDS:
+        if days < bound or (bound_included and days == bound):
+            return complexity
+    return COMPLEXITY_ABOVE_THRESHOLDS
+
+
+def get_complexity_sql_case(column):
+    """
+    Build the SQL CASE expression computing the complexity from an estimated days column,
+    with the same thresholds as get_complexity_from_days.
+    """
+    whens = ' '.join(
+        f"WHEN COALESCE({column}, 0) {'<=' if bound_included else '<'} {float(bound)} THEN '{complexity}'"
+        for bound, bound_included, complexity in COMPLEXITY_THRESHOLDS
+    )
+    return f"CASE {whens} ELSE '{COMPLEXITY_ABOVE_THRESHOLDS}' END"
+
+
+def vals_change_estimated_work_days(vals):
+    """Check if create or write values set estimated days, directly or through the commands of x2many fields"""
+    if 'estimated_work_days' in vals:
+        return True
+    return any(
+        isinstance(command, (list, tuple)) and len(command) == 3 and isinstance(command[2], dict)
+        and vals_change_estimated_work_days(command[2])
+        for value in vals.values() if isinstance(value, (list, tuple))
+        for command in value
+    )
+
+
+def get_complexity_thresholds_signature():
+    """Return a signature of the complexity thresholds, which changes whenever they are modified"""
+    return repr((COMPLEXITY_THRESHOLDS, COMPLEXITY_ABOVE_THRESHOLDS))
 
 
 def get_days_from_complexity(complexity):
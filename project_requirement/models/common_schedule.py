@@ -0,0 +1,232 @@
+"""
+Common scheduling utilities for requirement lines.
+This module centralizes the order-group scheduling algorithm used to plan requirement lines.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from .common_dates import (
+    ensure_business_day,
+    get_next_business_day,
+    add_working_days,
+    add_working_days_batch,
+    adjust_duration_by_workforce,
+    count_working_days
+)
+
+# Requirement line models scheduled by order groups
+REQUIREMENT_LINE_MODELS = ('project.requirement.line', 'project.custom.requirement.line')
+
+# Field linking a generated task to its line, for each requirement line model
+TASK_REQUIREMENT_LINE_FIELDS = {
+    'project.requirement.line': 'requirement_line_id',
+    'project.custom.requirement.line': 'custom_requirement_line_id',
+}
+
+# Key of the dirty-order tracker in the transaction's precommit data
+DIRTY_SCHEDULE_KEY = 'project_requirement.dirty_schedule_orders'
+
+
+class OrderSchedule:
+    """
+    Planned dates of the requirement lines of a project, computed in a single forward pass.
+
+    Lines sharing the same order run in parallel and start on the same day.
+    Each following order group starts on the business day after the earliest
+    end date of the previous group.
+    """
+
+    def __init__(self, project_start_date, lines, workforce_factor, calendar=None):
+        """
+        Args:
+            project_start_date: The project start date
+            lines: Iterable of (key, order, estimated_work_days) tuples
+            workforce_factor: Workforce factor applied to the estimated work days
+            calendar: Optional WorkingDayIndex of the company, to skip its holidays
+        """
+        self.workforce_factor = workforce_factor
+        self.calendar = calendar
+
+        # Group lines by order
+        lines_by_order = defaultdict(list)
+        for key, order, work_days in lines:
+            lines_by_order[order or 0].append((key, work_days))
+
+        # Sorted orders and the start date of each order group.
+        # group_starts has one more item than orders: the day following the last group.
+        self.orders = sorted(lines_by_order)
+        self.group_starts = []
+        self.line_dates = {}
+
+        # Start with project start date (ensure it's a business day)
+        current_date = ensure_business_day(project_start_date, calendar)
+
+        for order in self.orders:
+            self.group_starts.append(current_date)
+            group_lines = lines_by_order[order]
+            end_dates = add_working_days_batch(
+                current_date, [self.get_duration(work_days) for _key, work_days in group_lines], calendar)
+            for (key, _work_days), end_date in zip(group_lines, end_dates):
+                self.line_dates[key] = (current_date, end_date)
+
+            # Next order starts after the earliest end date in current order
+            current_date = get_next_business_day(min(end_dates), calendar)
+
+        self.group_starts.append(current_date)
+
+    def get_duration(self, work_days):
+        """Return the duration in business days of a line, adjusted by the workforce factor"""
+        return adjust_duration_by_workforce(work_days or 0, self.workforce_factor)
+
+    def get_end_date(self, start_date, work_days):
+        """Return the end date of a line starting on start_date"""
+        return add_working_days(start_date, self.get_duration(work_days), self.calendar)
+
+    def get_start_date(self, order):
+        """Return the start date of the given order, i.e. the day after all lower orders are done"""
+        return self.group_starts[bisect_left(self.orders, order or 0)]
+
+    def get_dates(self, order, work_days):
+        """Return the (start_date, end_date) of a line with the given order and work days"""
+        start_date = self.get_start_date(order)
+        return start_date, self.get_end_date(start_date, work_days)
+
+
+def reschedule_order_groups(project_start_date, lines, workforce_factor, dirty_orders=None, calendar=None):
+    """
+    Recompute the planned dates of a project's requirement lines from the lowest dirty order onwards.
+
+    Order groups below the lowest dirty order cannot change and keep their stored dates.
+    The forward pass stops as soon as a group ends on the same date as before and no dirty
+    group follows it, since every later group then keeps its stored dates as well.
+
+    Args:
+        project_start_date: The project start date
+        lines: Iterable of (key, order, estimated_work_days, planned_start_date, planned_end_date)
+            tuples, the dates being the currently stored ones
+        workforce_factor: Workforce factor applied to the estimated work days
+        dirty_orders: Orders whose lines changed, or None to reschedule every group
+        calendar: Optional WorkingDayIndex of the company, to skip its holidays
+
+    Returns:
+        dict: Mapping of key to its new (start_date, end_date), for the lines whose dates changed
+    """
+    lines_by_order = defaultdict(list)
+    for key, order, work_days, start_date, end_date in lines:
+        lines_by_order[order or 0].append((key, work_days, start_date, end_date))
+
+    orders = sorted(lines_by_order)
+    if not orders:
+        return {}
+
+    def stored_next_start(order):
+        """Start date of the group following the given order, based on stored dates"""
+        end_dates = [end_date for _key, _work_days, _start_date, end_date in lines_by_order[order]]
+        if not all(end_dates):
+            return None
+        return get_next_business_day(min(end_dates), calendar)
+
+    if dirty_orders is not None:
+        if not dirty_orders:
+            return {}
+        dirty_orders = sorted(dirty_orders)
+
+    # Find the first group to reschedule and its start date
+    index = bisect_left(orders, dirty_orders[0]) if dirty_orders else 0
+    current_date = stored_next_start(orders[index - 1]) if index > 0 else None
+    if current_date is None:
+        index = 0
+        current_date = ensure_business_day(project_start_date, calendar)
+
+    changes = {}
+    while index < len(orders):
+        order = orders[index]
+        group_lines = lines_by_order[order]
+        durations = [adjust_duration_by_workforce(work_days or 0, workforce_factor)
+                     for _key, work_days, _start_date, _end_date in group_lines]
+        end_dates = add_working_days_batch(current_date, durations, calendar)
+
+        for (key, _work_days, start_date, end_date), new_end_date in zip(group_lines, end_dates):
+            if (start_date, end_date) != (current_date, new_end_date):
+                changes[key] = (current_date, new_end_date)
+
+        next_start = get_next_business_day(min(end_dates), calendar)
+        index += 1
+
+        if dirty_orders is not None and order not in dirty_orders and next_start == stored_next_start(order):
+            # This unchanged group ends as before: later groups keep their dates up to the next dirty group
+            later_dirty_orders = [dirty_order for dirty_order in dirty_orders if dirty_order > order]
+            if not later_dirty_orders:
+                break
+            dirty_index = bisect_left(orders, later_dirty_orders[0])
+            jump_start = stored_next_start(orders[dirty_index - 1]) if dirty_index > index else None
+            if jump_start is not None:
+                index, next_start = dirty_index, jump_start
+
+        current_date = next_start
+
+    return changes
+
+
+def compute_schedule_float(lines, calendar=None):
+    """
+    Compute the latest dates, total float and critical-path membership of scheduled requirement lines.
+
+    The project ends with its latest line end (MEP date). Delaying a line delays the project
+    once its end passes that date. Delaying the line that ends first in its order group also
+    delays every later group, up to the day another line of the group ends first instead.
+    The order groups are processed once, from the last to the first.
+
+    Args:
+        lines: Iterable of (key, order, planned_start_date, planned_end_date) tuples
+        calendar: Optional WorkingDayIndex of the company, to skip its holidays
+
+    Returns:
+        dict: Mapping of key to (latest_start_date, latest_end_date, total_float, is_critical),
+        the total float being expressed in working days. Lines without dates are omitted.
+    """
+    lines_by_order = defaultdict(list)
+    for key, order, start_date, end_date in lines:
+        if start_date and end_date:
+            lines_by_order[order or 0].append((key, start_date, end_date))
+
+    if not lines_by_order:
+        return {}
+
+    project_end_date = max(end_date for group_lines in lines_by_order.values()
+                           for _key, _start_date, end_date in group_lines)
+
+    def shift(dt, working_days):
+        """Move a date forward by the given number of working days"""
+        return add_working_days(dt, working_days + 1, calendar) if working_days else dt
+
+    analysis = {}
+    # Working days every later group can be delayed by without delaying the project (None: no later group)
+    later_slack = None
+
+    for order in reversed(sorted(lines_by_order)):
+        group_lines = lines_by_order[order]
+        end_dates = sorted(end_date for _key, _start_date, end_date in group_lines)
+        earliest_end_date = end_dates[0]
+
+        # Working days the first ending line can slip before another line of the group ends first
+        driver_gap = count_working_days(earliest_end_date, end_dates[1], calendar) if len(end_dates) > 1 else None
+
+        group_slack = None
+        for key, start_date, end_date in group_lines:
+            slack_until_end = count_working_days(end_date, project_end_date, calendar)
+            total_float = slack_until_end
+
+            # The line driving the next group start also delays every later group
+            is_driver = end_date == earliest_end_date and driver_gap != 0
+            if is_driver and later_slack is not None and (driver_gap is None or driver_gap > later_slack):
+                total_float = min(total_float, later_slack)
+
+            analysis[key] = (shift(start_date, total_float), shift(end_date, total_float),
+                             total_float, total_float == 0)
+            group_slack = slack_until_end if group_slack is None else min(group_slack, slack_until_end)
+
+        later_slack = group_slack if later_slack is None else min(later_slack, group_slack)
+
+    return analysis
@@ -1,3 +1,9 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from odoo import models, fields, api
 from odoo.exceptions import UserError
 from odoo.tools.translate import _
@@ -13,9 +19,40 @@ from .common_projects import (
     get_generic_department
 )
 from .common_requirements import (
-    HOURS_PER_DAY
+    HOURS_PER_DAY,
+    START_WORK_TIME,
+    END_WORK_TIME,
+    datetime_with_business_hour,
+    get_complexity_sql_case,
+    get_complexity_thresholds_signature,
+    vals_change_estimated_work_days
+)
+from .common_schedule import (
+    DIRTY_SCHEDULE_KEY,
+    REQUIREMENT_LINE_MODELS,
+    TASK_REQUIREMENT_LINE_FIELDS,
+    OrderSchedule,
+    compute_schedule_float,
+    reschedule_order_groups
 )
 
+_logger = logging.getLogger(__name__)
+
+# Stages whose schedule is still refreshed by the portfolio reschedule
+PORTFOLIO_RESCHEDULE_STAGES = ('preparation', 'devis_created', 'devis_validated')
+PORTFOLIO_RESCHEDULE_CHUNK_SIZE = 100
+PORTFOLIO_RESCHEDULE_WORKERS = 4
+
+# Fields of the projects their requirement lines are scheduled from
+SCHEDULE_FIELDS = {'date_start', 'company_id', 'profile_line_ids'}
+
+# Subrequirement line models of the projects, storing a complexity computed from their estimated days
+SUBREQUIREMENT_LINE_MODELS = ('project.subrequirement.line', 'project.custom.subrequirement.line')
+# Models storing a complexity computed from their estimated days
+COMPLEXITY_MODELS = ('project.subrequirement',) + SUBREQUIREMENT_LINE_MODELS
+# System parameter holding the signature of the thresholds the stored complexities follow
+COMPLEXITY_THRESHOLDS_PARAM = 'project_requirement.complexity_thresholds'
+
 
 class Project(models.Model):
     _inherit = 'project.project'
@@ -211,6 +248,16 @@ class Project(models.Model):
                                                          compute="_compute_profiles_vs_requirements_workload_info",
                                                          store=False)
 
+    # Aggregates of the requirement and profile lines, maintained by their dependencies
+    total_requirement_days = fields.Float(string="Charge totale des exigences (Jours)",
+                                          compute="_compute_total_requirement_days", store=True)
+    total_profile_days = fields.Float(string="Charge totale des profils (Jours)",
+                                      compute="_compute_profile_aggregates", store=True)
+    average_daily_rate = fields.Float(string="Taux journalier moyen", compute="_compute_profile_aggregates",
+                                      store=True, help="Moyenne des taux journaliers pondérés par l'implication")
+    workforce_factor = fields.Float(string="Facteur de charge", compute="_compute_profile_aggregates", store=True,
+                                    help="Somme des pourcentages d'implication des profils")
+
     # Department lots fields
     lot_ids = fields.One2many('project.department.lot', 'project_id', string='Lots de départements')
     lot_count = fields.Integer(compute='_compute_lot_count', string='Nombre de lots')
@@ -435,20 +482,68 @@ class Project(models.Model):
     @api.depends('department_ids', 'requirement_line_ids', 'requirement_line_ids.requirement_id')
     def _compute_has_new_requirements(self):
         """Determine if there are new requirements that can be inserted"""
-        for project in self:
+        # Saved projects: a single anti-join query for all of them
+        saved_projects = self.filtered(lambda project: isinstance(project.id, int))
+        missing_counts = saved_projects._get_missing_requirements()
+        for project in saved_projects:
+            project.has_new_requirements = missing_counts.get(project.id, 0) > 0
+
+        # Projects being edited (onchange): their departments and lines are only in memory
+        catalogue = self.env['project.requirement']
+        snapshot = catalogue._get_catalogue_snapshot() if self - saved_projects else None
+        for project in self - saved_projects:
             # Only check if departments are selected
             if not project.department_ids:
                 project.has_new_requirements = False
                 continue
 
             # Find available requirements that are not already in the project
-            existing_requirement_ids = project.requirement_line_ids.mapped('requirement_id.id')
-            new_requirements_count = self.env['project.requirement'].search_count([
-                ('department_id', 'in', project.department_ids.ids),
-                ('id', 'not in', existing_requirement_ids)
-            ])
+            existing_requirement_ids = set(project.requirement_line_ids.mapped('requirement_id.id'))
+            requirements = catalogue._get_catalogue_requirements(project.department_ids.ids, snapshot)
+
+            project.has_new_requirements = any(
+                requirement[0] not in existing_requirement_ids for requirement in requirements)
 
-            project.has_new_requirements = new_requirements_count > 0
+    def _get_missing_requirements(self, with_ids=False):
+        """
+        Find the catalogue requirements of the projects' departments that are not in their requirement lines,
+        with one grouped anti-join query for all the projects.
+
+        Args:
+            with_ids: Return the missing requirement ids instead of their count
+
+        Returns:
+            dict: Maps each project id with missing requirements to their count, or to the list of
+            their ids ordered by sequence and id if with_ids is set
+        """
+        if not self:
+            return {}
+
+        department_field = self._fields['department_ids']
+        requirement_model = self.env['project.requirement']
+        line_model = self.env['project.requirement.line']
+
+        # Pending changes must reach the database before the query
+        self.flush_model(['department_ids'])
+        requirement_model.flush_model(['department_id', 'sequence'])
+        line_model.flush_model(['project_id', 'requirement_id'])
+
+        aggregate = 'array_agg(requirement.id ORDER BY requirement.sequence, requirement.id)' if with_ids else 'count(*)'
+        self.env.cr.execute(f"""
+            SELECT rel.{department_field.column1}, {aggregate}
+              FROM {department_field.relation} AS rel
+              JOIN {requirement_model._table} AS requirement
+                ON requirement.department_id = rel.{department_field.column2}
+             WHERE rel.{department_field.column1} IN %s
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM {line_model._table} AS line
+                     WHERE line.project_id = rel.{department_field.column1}
+                       AND line.requirement_id = requirement.id
+                   )
+          GROUP BY rel.{department_field.column1}
+        """, (tuple(self.ids),))
+        return dict(self.env.cr.fetchall())
 
     @api.depends('sale_order_ids', 'sale_order_ids.state')
     def _compute_project_state_from_devis(self):
@@ -575,17 +670,63 @@ class Project(models.Model):
 
     def _recompute_subrequirements_complexity(self):
         """
-        Recompute complexity for all subrequirement lines in the project.
-        This ensures that complexity values are always up-to-date with the current thresholds.
+        Realign the stored complexity of the projects' subrequirement lines with their estimated days.
+        One UPDATE per subrequirement line model, restricted to the rows whose complexity differs.
         """
-        for project in self:
-            subreq_lines = self.env['project.subrequirement.line'].search([
-                ('requirement_line_id.project_id', '=', project.id)
-            ])
-            if subreq_lines:
-                # Force recompute of complexity based on current estimated_work_days values
-                for line in subreq_lines:
-                    line._compute_complexity()
+        if not self:
+            return
+
+        complexity_case = get_complexity_sql_case('line.estimated_work_days')
+        for model_name in SUBREQUIREMENT_LINE_MODELS:
+            model = self.env[model_name]
+            parent_field = model._fields[model._get_parent_requirement_field_name()]
+            parent_model = self.env[parent_field.comodel_name]
+            model.flush_model(['estimated_work_days', 'complexity', parent_field.name])
+            parent_model.flush_model(['project_id'])
+            self.env.cr.execute(f"""
+                UPDATE {model._table} AS line
+                   SET complexity = {complexity_case}
+                  FROM {parent_model._table} AS parent
+                 WHERE line.{parent_field.name} = parent.id
+                   AND parent.project_id IN %s
+                   AND line.complexity IS DISTINCT FROM {complexity_case}
+             RETURNING line.id
+            """, [tuple(self.ids)])
+            updated_records = model.browse([row[0] for row in self.env.cr.fetchall()])
+            if updated_records:
+                updated_records.invalidate_recordset(['complexity'])
+                updated_records.modified(['complexity'])
+
+    @api.model
+    def _realign_complexity_thresholds(self):
+        """
+        Realign the stored complexity of all the subrequirements and subrequirement lines with the current
+        thresholds. Run on install and by the migrations changing the thresholds: one UPDATE per model,
+        restricted to the rows whose complexity differs, skipped when the thresholds are already applied.
+        """
+        signature = get_complexity_thresholds_signature()
+        params = self.env['ir.config_parameter'].sudo()
+        if params.get_param(COMPLEXITY_THRESHOLDS_PARAM) == signature:
+            return
+
+        complexity_case = get_complexity_sql_case('estimated_work_days')
+        for model_name in COMPLEXITY_MODELS:
+            model = self.env[model_name]
+            model.flush_model(['estimated_work_days', 'complexity'])
+            self.env.cr.execute(f"""
+                UPDATE {model._table}
+                   SET complexity = {complexity_case}
+                 WHERE complexity IS DISTINCT FROM {complexity_case}
+             RETURNING id
+            """)
+            updated_records = model.browse([row[0] for row in self.env.cr.fetchall()])
+            if updated_records:
+                updated_records.invalidate_recordset(['complexity'])
+                updated_records.modified(['complexity'])
+                if model_name == 'project.subrequirement':
+                    self.env['project.requirement']._invalidate_catalogue_snapshot()
+
+        params.set_param(COMPLEXITY_THRESHOLDS_PARAM, signature)
 
     @api.depends('project_type')
     def _compute_show_profiles_tab(self):
@@ -673,10 +814,8 @@ class Project(models.Model):
             # Validation is based on core business logic
             project.requirements_required = project._project_requires_requirements()
 
-    @api.depends('profile_line_ids', 'profile_line_ids.workload_days', 'requirement_line_ids',
-                 'requirement_line_ids.estimated_work_days', 'custom_requirement_line_ids',
-                 'custom_requirement_line_ids.estimated_work_days', 'custom_requirements_required',
-                 'regular_requirements_required')
+    @api.depends('profile_line_ids', 'total_profile_days', 'requirement_line_ids', 'custom_requirement_line_ids',
+                 'total_requirement_days', 'custom_requirements_required', 'regular_requirements_required')
     def _compute_profiles_workload_valid(self):
         """
         Verify that the sum of profile workloads doesn't exceed the total requirement workload.
@@ -703,11 +842,9 @@ class Project(models.Model):
             if not requirement_lines:
                 continue
 
-            # Calculate total profile workload
-            total_profile_workload = sum(project.profile_line_ids.mapped('workload_days'))
-
-            # Calculate total requirements workload
-            total_requirement_workload = sum(requirement_lines.mapped('estimated_work_days'))
+            # Total profile and requirements workloads
+            total_profile_workload = project.total_profile_days
+            total_requirement_workload = project.total_requirement_days
 
             # Check if profile workload exceeds requirement workload
             # Allow for small rounding differences (0.01 days)
@@ -723,9 +860,8 @@ class Project(models.Model):
                     f"ne peut pas dépasser la charge des exigences ({formatted_req_load} jours)"
                 )
 
-    @api.depends('profile_line_ids.workload_days', 'requirement_line_ids.estimated_work_days',
-                 'custom_requirement_line_ids.estimated_work_days', 'custom_requirements_required',
-                 'regular_requirements_required')
+    @api.depends('profile_line_ids', 'total_profile_days', 'requirement_line_ids', 'custom_requirement_line_ids',
+                 'total_requirement_days', 'custom_requirements_required', 'regular_requirements_required')
     def _compute_profiles_vs_requirements_workload_info(self):
         """Compute the string showing current profile workload vs requirement workload."""
         for project in self:
@@ -747,9 +883,9 @@ class Project(models.Model):
                 project.profiles_vs_requirements_workload_info = "Aucun profil défini."
                 continue
 
-            # Calculate the total workloads
-            profile_workload = sum(project.profile_line_ids.mapped('workload_days'))
-            requirement_workload = sum(requirement_lines.mapped('estimated_work_days'))
+            # Total workloads
+            profile_workload = project.total_profile_days
+            requirement_workload = project.total_requirement_days
 
             # Format the numbers - show as int if no decimal part
             formatted_profile_workload = int(
@@ -760,6 +896,36 @@ class Project(models.Model):
             # Bold label and clean format
             project.profiles_vs_requirements_workload_info = f"<b>Charge assignée:</b> {formatted_profile_workload} / {formatted_requirement_workload} jours"
 
+    @api.depends('requirement_line_ids.estimated_work_days', 'custom_requirement_line_ids.estimated_work_days',
+                 'custom_requirements_required')
+    def _compute_total_requirement_days(self):
+        """Sum the estimated work days of the requirement lines the project is planned with"""
+        for project in self:
+            if project.custom_requirements_required:
+                requirement_lines = project.custom_requirement_line_ids
+            else:
+                requirement_lines = project.requirement_line_ids
+            project.total_requirement_days = sum(requirement_lines.mapped('estimated_work_days'))
+
+    @api.depends('profile_line_ids.workload_days', 'profile_line_ids.daily_rate',
+                 'profile_line_ids.involvement_percentage')
+    def _compute_profile_aggregates(self):
+        """
+        Aggregate the profile lines in a single pass: total workload, average daily rate weighted by
+        involvement, and workforce factor (sum of involvements, 1.0 without profiles or involvement).
+        """
+        for project in self:
+            total_profile_days = total_weighted_rate = total_involvement = 0
+            for profile in project.profile_line_ids:
+                total_profile_days += profile.workload_days
+                total_weighted_rate += profile.daily_rate * profile.involvement_percentage
+                total_involvement += profile.involvement_percentage or 0
+
+            profile_count = len(project.profile_line_ids)
+            project.total_profile_days = total_profile_days
+            project.average_daily_rate = total_weighted_rate / profile_count if profile_count else 0
+            project.workforce_factor = total_involvement if total_involvement > 0 else 1.0
+
     @api.depends('lot_ids')
     def _compute_lot_count(self):
         for project in self:
@@ -1118,9 +1284,8 @@ class Project(models.Model):
         if not self.department_ids:
             return
 
-        # Get all requirements for selected departments
-        domain = [('department_id', 'in', self.department_ids.ids)]
-        requirements = self.env['project.requirement'].search(domain, order='sequence, id')
+        # Get all requirements for selected departments from the catalogue snapshot
+        requirements = self.env['project.requirement']._get_catalogue_requirements(self.department_ids.ids)
 
         # Find requirements to add and calculate next order number
         max_order = 0
@@ -1140,38 +1305,62 @@ class Project(models.Model):
             ).unlink()
 
         # Get the existing requirements after potential removals
-        existing_requirement_ids = self.requirement_line_ids.mapped('requirement_id.id')
+        existing_requirement_ids = set(self.requirement_line_ids.mapped('requirement_id.id'))
 
-        # Add only missing requirements, never modify existing ones
-        for requirement in requirements:
-            # Skip if requirement already exists (respect manual modifications)
-            if requirement.id in existing_requirement_ids:
-                continue
-
-            # Create new requirement line
-            max_order += 1
-
-            # Prepare values for requirement line
-            req_line_vals = {
-                'project_id': self.id,
-                'requirement_id': requirement.id,
-                'type': requirement.type,
-                'order': max_order,
-            }
-
-            # Create requirement line - allow subrequirements to be created only once during creation
-            # Explicitly set skip_auto_subrequirements=False to ensure we create subrequirements
-            # from_requirements_insertion=True to indicate this comes from auto-insertion
-            self.env['project.requirement.line'].with_context(
-                skip_auto_subrequirements=False,
-                from_requirements_insertion=True
-            ).create(req_line_vals)
+        # Add only missing requirements, never modify existing ones (respect manual modifications)
+        missing_requirements = [requirement for requirement in requirements
+                                if requirement[0] not in existing_requirement_ids]
+        if missing_requirements:
+            self._insert_requirement_lines(missing_requirements, max_order)
 
         # Refresh the computation of available requirements properly
         self.invalidate_recordset(['has_new_requirements'])
 
         return True
 
+    def _insert_requirement_lines(self, requirements, max_order=0):
+        """
+        Bulk-create the requirement lines of the given requirements, with their subrequirement lines.
+        All requirement lines are created in one batch, then all subrequirement lines in another,
+        and the project is renumbered and rescheduled once.
+
+        Args:
+            requirements: (id, sequence, type) catalogue tuples of the requirements to add, in insertion order
+            max_order: Highest order of the existing requirement lines
+
+        Returns:
+            project.requirement.line: The created requirement lines
+        """
+        self.ensure_one()
+        # from_requirements_insertion=True to indicate this comes from auto-insertion
+        # The subrequirement lines are created below in a single batch
+        req_lines = self.env['project.requirement.line'].with_context(
+            skip_auto_subrequirements=True,
+            skip_reordering=True,
+            from_requirements_insertion=True
+        ).create([{
+            'project_id': self.id,
+            'requirement_id': requirement_id,
+            'type': requirement_type,
+            'order': max_order + index,
+        } for index, (requirement_id, _sequence, requirement_type) in enumerate(requirements, start=1)])
+
+        # Default subrequirements of all requirements, read from the catalogue snapshot
+        catalogue = self.env['project.requirement']
+        snapshot = catalogue._get_catalogue_snapshot()
+        subreq_vals_list = [
+            dict(vals, requirement_line_id=req_line.id)
+            for req_line, (requirement_id, _sequence, _type) in zip(req_lines, requirements)
+            for vals in catalogue._get_catalogue_subrequirement_vals(requirement_id, snapshot)
+        ]
+        if subreq_vals_list:
+            self.env['project.subrequirement.line'].create(subreq_vals_list)
+
+        # Renumber once, which queues a single reschedule of the project
+        req_lines._reorder_project_requirements(self.id)
+
+        return req_lines
+
     def action_view_latest_devis(self):
         """Open the current active devis related to this project"""
         self.ensure_one()
@@ -1635,42 +1824,8 @@ class Project(models.Model):
             'task_ids': [(5, 0, 0)],
         })
 
-        # Copy requirement lines with their subrequirement lines
-        # 1. Create requirement lines without auto-generating subrequirements
-        # 2. Manually copy each subrequirement with exact values
-        # This ensures we get a perfect copy without generating default subrequirements
-        for req_line in self.requirement_line_ids:
-            # First create the requirement line with a context to skip auto-creation of subrequirements
-            new_req_line = self.env['project.requirement.line'].with_context(skip_auto_subrequirements=True).create({
-                'project_id': new_project.id,
-                'requirement_id': req_line.requirement_id.id,
-                'order': req_line.order,
-                'description': req_line.description,
-                'besoins': req_line.besoins,
-                'challenges': req_line.challenges,
-                'solutions': req_line.solutions,
-            })
-
-            # Then copy all subrequirement lines with their exact values
-            for subreq_line in req_line.subrequirement_line_ids:
-                self.env['project.subrequirement.line'].create({
-                    'requirement_line_id': new_req_line.id,
-                    'subrequirement_id': subreq_line.subrequirement_id.id,
-                    'estimated_work_days': subreq_line.estimated_work_days,
-                    'complexity': subreq_line.complexity,
-                })
-
-        # Copy profile lines
-        for profile_line in self.profile_line_ids:
-            profile_line.copy({
-                'project_id': new_project.id,
-            })
-
-        # Copy lot lines
-        for lot_line in self.lot_ids:
-            lot_line.copy({
-                'project_id': new_project.id,
-            })
+        # Copy requirement, subrequirement, profile and lot lines in bulk
+        self._copy_project_lines(new_project)
 
         # Update stage of the original project and set the reference to the implementation project
         self.write({
@@ -1691,6 +1846,51 @@ class Project(models.Model):
             'target': 'current',
         }
 
+    def _copy_project_lines(self, new_project):
+        """
+        Copy the requirement lines with their subrequirement lines, the profile lines and the lot lines
+        of the project into another project, with one batched create per model.
+        Reordering is suspended during the copy: the orders are copied as they are.
+
+        Args:
+            new_project: project.project receiving the copies
+        """
+        self.ensure_one()
+        req_lines = self.requirement_line_ids
+
+        # 1. Create requirement lines without auto-generating subrequirements
+        # This ensures we get a perfect copy without generating default subrequirements
+        new_req_lines = self.env['project.requirement.line'].with_context(
+            skip_auto_subrequirements=True,
+            skip_reordering=True
+        ).create([{
+            'project_id': new_project.id,
+            'requirement_id': req_line.requirement_id.id,
+            'order': req_line.order,
+            'description': req_line.description,
+            'besoins': req_line.besoins,
+            'challenges': req_line.challenges,
+            'solutions': req_line.solutions,
+        } for req_line in req_lines])
+
+        # 2. Copy all subrequirement lines with their exact values
+        subreq_vals_list = [{
+            'requirement_line_id': new_req_line.id,
+            'subrequirement_id': subreq_line.subrequirement_id.id,
+            'department_id': subreq_line.department_id.id,
+            'estimated_work_days': subreq_line.estimated_work_days,
+            'complexity': subreq_line.complexity,
+        } for req_line, new_req_line in zip(req_lines, new_req_lines)
+            for subreq_line in req_line.subrequirement_line_ids]
+        if subreq_vals_list:
+            self.env['project.subrequirement.line'].create(subreq_vals_list)
+
+        # 3. Copy profile and lot lines, each recordset is copied with a single create
+        if self.profile_line_ids:
+            self.profile_line_ids.copy({'project_id': new_project.id})
+        if self.lot_ids:
+            self.lot_ids.copy({'project_id': new_project.id})
+
     def action_view_implementation_project(self):
         """Open the implementation project generated from this project"""
         self.ensure_one()
@@ -1973,6 +2173,9 @@ class Project(models.Model):
         if not self.profiles_workload_valid:
             raise UserError(self.profiles_workload_message)
 
+        # Apply the queued reschedules so that tasks follow the current planned dates
+        self._reschedule_dirty_requirement_lines()
+
         # Select the appropriate requirement lines based on project type
         if self.custom_requirements_required:
             requirement_lines = self.custom_requirement_line_ids
@@ -1995,28 +2198,23 @@ class Project(models.Model):
             )
         )
 
-        # Create tasks in sequential order
-        tasks = []
-        sequence = 0
-
+        # Prepare the tasks in sequential order, the sequence sorts them in the task list view
+        task_vals_list = []
         for req_line in sorted_lines:
             estimated_work_days = req_line.estimated_work_days
 
-            if not estimated_work_days:
+            if estimated_work_days <= 0:
                 continue
 
-            sequence += 1
-            # Create task with the allocated time
-            task = self._create_task_for_requirement(
+            task_vals_list.append(self._prepare_requirement_task_vals(
                 req_line,
                 estimated_work_days,
+                sequence=len(task_vals_list) + 1,
                 is_custom_requirement=self.custom_requirements_required
-            )
+            ))
 
-            if task:
-                # Set sequence for sorting in task list view
-                task.sudo().write({'sequence': sequence})
-                tasks.append(task.id)
+        # Create all tasks with sudo in a single batch to avoid potential permission issues
+        tasks = self.env['project.task'].sudo().create(task_vals_list).ids if task_vals_list else []
 
         # Update the project state only if tasks were created
         if tasks:
@@ -2039,18 +2237,18 @@ class Project(models.Model):
                 "Aucune tâche n'a été générée. Veuillez vérifier que les exigences du projet ont des jours de travail estimés."
             )
 
-    def _create_task_for_requirement(self, req_line, estimated_work_days, is_custom_requirement=False):
+    def _prepare_requirement_task_vals(self, req_line, estimated_work_days, sequence=None,
+                                       is_custom_requirement=False):
         """
-        Create a task for a requirement line or custom requirement line.
+        Prepare the values of the task of a requirement line or custom requirement line.
+        The task is planned on the requirement line's planned dates, within business hours.
 
         Args:
             req_line: The requirement line (regular or custom)
             estimated_work_days: Estimated work days for the task
+            sequence: Position of the task in the task list view, if any
             is_custom_requirement: Whether the requirement is a custom requirement line (True) or a regular requirement line (False)
         """
-        if not req_line or estimated_work_days <= 0:
-            return False
-
         # Validate that we have stages
         if not self.type_ids:
             raise models.ValidationError("Aucune étape de tâche n'est définie pour ce projet.")
@@ -2065,18 +2263,21 @@ class Project(models.Model):
             'stage_id': first_stage.id,
             'allocated_hours': estimated_work_days * HOURS_PER_DAY,  # Convert days to hours
             'user_ids': [(5, 0, 0)],  # Clear all assigned users
+            'planned_date_begin': datetime_with_business_hour(req_line.planned_start_date, START_WORK_TIME),
+            'date_deadline': datetime_with_business_hour(req_line.planned_end_date, END_WORK_TIME),
         }
+        if sequence is not None:
+            task_vals['sequence'] = sequence
 
         # Type-specific values
+        department_name = req_line.department_id.name if req_line.department_id else ''
         if is_custom_requirement:
-            department_name = req_line.department_id.name if req_line.department_id else ''
             task_vals.update({
                 'name': f"{department_name} - {req_line.name}",
                 'description': req_line.challenges or '',
                 'custom_requirement_line_id': req_line.id,
             })
         else:
-            department_name = req_line.department_id.name if req_line.department_id else ''
             task_vals.update({
                 'name': f"{department_name} - {req_line.requirement_id.name}",
                 'description': req_line.challenges or '',
@@ -2084,39 +2285,7 @@ class Project(models.Model):
                 'requirement_line_id': req_line.id,
             })
 
-        task = self.env['project.task'].sudo().create(task_vals)
-
-        # Subtask generation code commented out - Can be re-enabled if subtask functionality is needed again
-        # Create subtasks for each subrequirement, sorted by sequence
-        # sorted_subreqs = req_line.subrequirement_line_ids.sorted(
-        #     key=lambda sr: (sr.subrequirement_id.sequence, sr.id)
-        # )
-        #
-        # # Track subtask sequence
-        # subtask_sequence = 0
-        #
-        # for subreq_line in sorted_subreqs:
-        #     subtask_sequence += 1
-        #     subtask_name = f"{department_name} - {subreq_line.subrequirement_id.description}"
-        #
-        #     # Use the same start and end dates as the requirement for simplicity
-        #     subtask_vals = {
-        #         'name': subtask_name,
-        #         'parent_id': task.id,
-        #         'project_id': self.id,
-        #         'partner_id': self.partner_id.id,
-        #         'user_ids': [(6, 0, user_ids)],
-        #         'planned_date_begin': start_date,
-        #         'date_deadline': end_date,
-        #         'sequence': subtask_sequence,  # Set sequence for ordering in list view
-        #     }
-        #     self.env['project.task'].sudo().create(subtask_vals)
-
-        return task
-
-    def _create_task_for_custom_requirement(self, custom_req_line, estimated_work_days):
-        """Create a task specifically for a custom requirement"""
-        return self._create_task_for_requirement(custom_req_line, estimated_work_days, is_custom_requirement=True)
+        return task_vals
 
     def _assign_project_manager_to_tasks(self, task_ids):
         """
@@ -2150,20 +2319,394 @@ class Project(models.Model):
 
     def _calculate_workforce_factor(self):
         """
-        Calculate workforce factor from profiles.
-        The workforce factor is the sum of all involvement percentages.
+        Return the workforce factor from profiles.
+        The workforce factor is the sum of all involvement percentages, 1.0 if the sum is 0 or without profiles.
         """
-        if not self.profile_line_ids:
-            return 1.0  # Default to 1.0 if no profiles
+        return self.workforce_factor or 1.0
+
+    def _get_working_day_index(self):
+        """Return the working-day index of the project's company, holidays included"""
+        self.ensure_one()
+        return (self.company_id or self.env.company)._get_working_day_index()
+
+    def _reschedule_requirement_lines(self):
+        """
+        Recompute the planned dates of all requirement lines of the projects.
+        Each project is scheduled in a single pass over its order groups,
+        for both standard and custom requirement lines.
+        """
+        if not self:
+            return True
+
+        self._mark_full_schedule_dirty()
+        self._reschedule_dirty_requirement_lines()
+        return True
 
-        total_involvement = sum(
-            profile.involvement_percentage for profile in self.profile_line_ids
-            if profile.involvement_percentage
+    def _get_dirty_schedule_tracker(self):
+        """
+        Return the dirty-order tracker of the current transaction.
+        It maps (model_name, project_id) to the set of changed orders,
+        or to None when every order group of the project must be rescheduled.
+        """
+        return self.env.cr.precommit.data.setdefault(DIRTY_SCHEDULE_KEY, {})
+
+    def _mark_schedule_dirty(self, model_name, orders=None):
+        """
+        Mark order groups of the projects' requirement lines as needing a reschedule.
+
+        Args:
+            model_name: Requirement line model whose schedule is affected
+            orders: Iterable of changed orders, or None to reschedule every order group
+        """
+        tracker = self._get_dirty_schedule_tracker()
+        if not tracker:
+            # First change of the transaction: process the queue once before commit
+            self.env.cr.precommit.add(self.env['project.project']._flush_schedule_queue)
+
+        for project in self:
+            key = (model_name, project.id)
+            if orders is None or (key in tracker and tracker[key] is None):
+                tracker[key] = None
+            else:
+                tracker.setdefault(key, set()).update(order or 0 for order in orders)
+
+    def _mark_full_schedule_dirty(self):
+        """Mark every order group of the projects' standard and custom requirement lines as needing a reschedule"""
+        if not self:
+            return
+        for model_name in REQUIREMENT_LINE_MODELS:
+            self._mark_schedule_dirty(model_name)
+
+    @api.model
+    def _mark_company_schedules_dirty(self, companies):
+        """
+        Queue the full reschedule of the projects of companies whose working days changed.
+        Only the projects with a start date in the stages refreshed by the portfolio reschedule are concerned.
+        """
+        self.sudo().search([
+            ('company_id', 'in', companies.ids + [False]),
+            ('stage', 'in', PORTFOLIO_RESCHEDULE_STAGES),
+            ('date_start', '!=', False),
+        ])._mark_full_schedule_dirty()
+
+    @api.model
+    def _reschedule_dirty_requirement_lines(self):
+        """
+        Reschedule the order groups marked as dirty and empty the tracker.
+
+        Returns:
+            int: Number of requirement lines whose planned dates changed
+        """
+        tracker = self._get_dirty_schedule_tracker()
+        rescheduled_count = 0
+        while tracker:
+            (model_name, project_id), orders = tracker.popitem()
+            project = self.browse(project_id).exists()
+            if project:
+                rescheduled_count += project._reschedule_order_groups(model_name, orders)
+        return rescheduled_count
+
+    @api.model
+    def _flush_schedule_queue(self):
+        """Precommit hook: reschedule the dirty order groups and flush the resulting writes"""
+        if self._get_dirty_schedule_tracker():
+            self._reschedule_dirty_requirement_lines()
+            self.env.flush_all()
+
+    def web_read(self, specification):
+        """Apply the queued reschedules before the client reads the requirement lines"""
+        self._reschedule_dirty_requirement_lines()
+        return super().web_read(specification)
+
+    def _reschedule_order_groups(self, model_name, dirty_orders=None):
+        """
+        Reschedule the project's requirement lines from the lowest dirty order onwards.
+        Lower order groups keep their dates. The critical-path analysis of every line is then
+        refreshed, and only the lines whose values change are written.
+
+        Args:
+            model_name: Requirement line model to reschedule
+            dirty_orders: Set of changed orders, or None to reschedule every order group
+
+        Returns:
+            int: Number of requirement lines whose planned dates changed
+        """
+        self.ensure_one()
+        line_model = self.env[model_name].with_context(skip_date_validation=True)
+        lines = line_model.search_fetch(
+            [('project_id', '=', self.id)],
+            ['order', 'estimated_work_days', 'planned_start_date', 'planned_end_date',
+             'latest_start_date', 'latest_end_date', 'total_float', 'is_critical'])
+        if not lines:
+            return 0
+
+        calendar = self._get_working_day_index()
+        vals_by_line = defaultdict(dict)
+        if not self.date_start:
+            for line in lines.filtered(lambda line: line.planned_start_date or line.planned_end_date):
+                vals_by_line[line.id].update(planned_start_date=False, planned_end_date=False)
+            dates_by_line = {}
+        else:
+            changes = reschedule_order_groups(
+                self.date_start,
+                [(line.id, line.order, line.estimated_work_days, line.planned_start_date, line.planned_end_date)
+                 for line in lines],
+                self._calculate_workforce_factor(),
+                dirty_orders=dirty_orders,
+                calendar=calendar,
+            )
+            for line_id, (start_date, end_date) in changes.items():
+                vals_by_line[line_id].update(planned_start_date=start_date, planned_end_date=end_date)
+            dates_by_line = {
+                line.id: changes.get(line.id, (line.planned_start_date, line.planned_end_date))
+                for line in lines
+            }
+
+        # Refresh the critical-path analysis, which depends on the whole schedule
+        analysis = compute_schedule_float(
+            [(line.id, line.order) + dates_by_line[line.id] for line in lines if line.id in dates_by_line],
+            calendar=calendar,
         )
+        for line in lines:
+            line_analysis = analysis.get(line.id, (False, False, 0, False))
+            if line_analysis != (line.latest_start_date, line.latest_end_date, line.total_float, line.is_critical):
+                vals_by_line[line.id].update(zip(
+                    ('latest_start_date', 'latest_end_date', 'total_float', 'is_critical'), line_analysis))
+
+        # Write lines sharing the same values together
+        line_ids_by_vals = defaultdict(list)
+        for line_id, vals in vals_by_line.items():
+            line_ids_by_vals[tuple(sorted(vals.items()))].append(line_id)
+        for vals, line_ids in line_ids_by_vals.items():
+            line_model.browse(line_ids).write(dict(vals))
+
+        # Move the generated tasks of the rescheduled lines
+        rescheduled_dates = {
+            line_id: (vals['planned_start_date'], vals['planned_end_date'])
+            for line_id, vals in vals_by_line.items() if 'planned_start_date' in vals
+        }
+        self._sync_requirement_task_dates(model_name, rescheduled_dates)
+
+        return len(rescheduled_dates)
+
+    def _sync_requirement_task_dates(self, model_name, dates_by_line):
+        """
+        Align the planned dates of the tasks generated from requirement lines with the lines' new dates,
+        within business hours. Only the tasks whose dates differ are written, tasks sharing the same
+        dates in a single write.
+
+        Args:
+            model_name: Requirement line model the tasks are linked to
+            dates_by_line: {line_id: (planned_start_date, planned_end_date)} of the rescheduled lines
+        """
+        # Lines without dates (project without start date) leave their tasks untouched
+        dates_by_line = {line_id: dates for line_id, dates in dates_by_line.items() if all(dates)}
+        if not dates_by_line:
+            return
 
-        if total_involvement > 0:
-            return total_involvement
-        return 1.0  # Default to 1.0 if the sum is 0
+        link_field = TASK_REQUIREMENT_LINE_FIELDS[model_name]
+        tasks = self.env['project.task'].sudo().search_fetch(
+            [(link_field, 'in', list(dates_by_line))],
+            [link_field, 'planned_date_begin', 'date_deadline'])
+
+        task_ids_by_dates = defaultdict(list)
+        for task in tasks:
+            start_date, end_date = dates_by_line[task[link_field].id]
+            task_dates = (datetime_with_business_hour(start_date, START_WORK_TIME),
+                          datetime_with_business_hour(end_date, END_WORK_TIME))
+            if task_dates != (task.planned_date_begin, task.date_deadline):
+                task_ids_by_dates[task_dates].append(task.id)
+
+        for (planned_date_begin, date_deadline), task_ids in task_ids_by_dates.items():
+            tasks.browse(task_ids).write({
+                'planned_date_begin': planned_date_begin,
+                'date_deadline': date_deadline,
+            })
+
+    @api.model
+    def _cron_reschedule_portfolio(self, chunk_size=PORTFOLIO_RESCHEDULE_CHUNK_SIZE,
+                                   workers=PORTFOLIO_RESCHEDULE_WORKERS):
+        """
+        Reschedule the requirement lines of every project still in preparation or quotation stages,
+        e.g. after a change of the holiday calendar or of subrequirement defaults.
+
+        The projects are split in chunks, each chunk is rescheduled and committed with its own cursor,
+        and the chunks are spread over a pool of worker threads. A failing chunk is rolled back and
+        logged without stopping the others. Also usable from an Odoo shell:
+        env['project.project']._cron_reschedule_portfolio(chunk_size=200, workers=8)
+
+        Args:
+            chunk_size: Number of projects rescheduled per transaction
+            workers: Number of chunks processed in parallel, each holding a database connection
+
+        Returns:
+            dict: Summary with the keys 'projects', 'chunks', 'failed_chunks' and 'rescheduled_lines'
+        """
+        # Committed data only: each chunk reads the projects through its own cursor
+        self.env.flush_all()
+        project_ids = self.search([('stage', 'in', PORTFOLIO_RESCHEDULE_STAGES), ('date_start', '!=', False)]).ids
+        chunks = [project_ids[i:i + chunk_size] for i in range(0, len(project_ids), chunk_size)]
+        summary = {'projects': len(project_ids), 'chunks': len(chunks), 'failed_chunks': 0, 'rescheduled_lines': 0}
+        if not chunks:
+            _logger.info("Portfolio reschedule: no project to reschedule")
+            return summary
+
+        _logger.info("Portfolio reschedule: %s projects in %s chunks, %s workers",
+                     len(project_ids), len(chunks), min(workers, len(chunks)))
+        started_at = time.monotonic()
+        dbname, uid, context = self.env.cr.dbname, self.env.uid, dict(self.env.context)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+            futures = [
+                executor.submit(self._reschedule_portfolio_chunk, dbname, uid, context, chunk)
+                for chunk in chunks
+            ]
+            for done_count, future in enumerate(as_completed(futures), start=1):
+                rescheduled_count = future.result()
+                if rescheduled_count is None:
+                    summary['failed_chunks'] += 1
+                else:
+                    summary['rescheduled_lines'] += rescheduled_count
+                _logger.info("Portfolio reschedule: %s/%s chunks done, %s lines rescheduled so far",
+                             done_count, len(chunks), summary['rescheduled_lines'])
+
+        _logger.info("Portfolio reschedule finished in %.1fs: %s projects, %s lines rescheduled, %s failed chunks",
+                     time.monotonic() - started_at, summary['projects'], summary['rescheduled_lines'],
+                     summary['failed_chunks'])
+        return summary
+
+    def _reschedule_portfolio_chunk(self, dbname, uid, context, project_ids):
+        """
+        Reschedule a chunk of projects in its own transaction. Runs in a worker thread.
+
+        Returns:
+            int: Number of requirement lines whose planned dates changed, or None if the chunk failed
+        """
+        threading.current_thread().dbname = dbname
+        try:
+            with self.env.registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                projects = env['project.project'].browse(project_ids).exists()
+                projects._mark_full_schedule_dirty()
+                rescheduled_count = projects._reschedule_dirty_requirement_lines()
+                env.flush_all()
+                return rescheduled_count
+        except Exception:
+            _logger.exception("Portfolio reschedule: chunk of projects %s failed", project_ids)
+            return None
+
+    def get_schedule_analysis(self):
+        """
+        Return the critical-path analysis of the project's requirement lines, based on their planned dates.
+
+        Returns:
+            list: One dict per requirement line, in order, with the keys 'model', 'id', 'name', 'order',
+            'earliest_start_date', 'earliest_end_date', 'latest_start_date', 'latest_end_date',
+            'total_float' (working days) and 'is_critical'
+        """
+        self.ensure_one()
+        self._reschedule_dirty_requirement_lines()
+
+        calendar = self._get_working_day_index()
+        result = []
+        for model_name in REQUIREMENT_LINE_MODELS:
+            lines = self.env[model_name].search([('project_id', '=', self.id)])
+            analysis = compute_schedule_float(
+                [(line.id, line.order, line.planned_start_date, line.planned_end_date) for line in lines],
+                calendar=calendar,
+            )
+            for line in lines:
+                latest_start_date, latest_end_date, total_float, is_critical = analysis.get(
+                    line.id, (False, False, 0, False))
+                result.append({
+                    'model': model_name,
+                    'id': line.id,
+                    'name': line.display_name,
+                    'order': line.order,
+                    'earliest_start_date': line.planned_start_date,
+                    'earliest_end_date': line.planned_end_date,
+                    'latest_start_date': latest_start_date,
+                    'latest_end_date': latest_end_date,
+                    'total_float': total_float,
+                    'is_critical': is_critical,
+                })
+        return result
+
+    def _get_schedule_model_name(self):
+        """Return the requirement line model driving the project's tasks and schedule"""
+        self.ensure_one()
+        if self.custom_requirements_required:
+            return 'project.custom.requirement.line'
+        return 'project.requirement.line'
+
+    def simulate_schedule(self, changes=None):
+        """
+        Compute the project's schedule in memory with hypothetical changes, without writing anything.
+        The requirement and profile lines are read once, then scheduled with the changes applied.
+
+        Args:
+            changes: Optional dict with the keys:
+                'involvements': {profile_line_id: involvement} to try another profile mix
+                'workforce_factor': Workforce factor overriding the one of the profiles
+                'orders': {requirement_line_id: order} to try another ordering
+                'work_days': {requirement_line_id: estimated_work_days} to try other workloads
+
+        Returns:
+            dict: With the keys 'workforce_factor', 'unit_price', 'end_date', 'total_amount' and
+            'lines', a list of dicts (id, name, order, estimated_work_days, planned_start_date,
+            planned_end_date, amount) for each requirement line
+        """
+        self.ensure_one()
+        changes = changes or {}
+        involvements = changes.get('involvements', {})
+        orders = changes.get('orders', {})
+        work_days = changes.get('work_days', {})
+
+        # Profiles: workforce factor and average daily rate
+        percentages = self.env['project.profile.line'].INVOLVEMENT_PERCENTAGES
+        profiles = [
+            (profile.daily_rate,
+             percentages.get(involvements[profile.id], 1.0) if profile.id in involvements
+             else profile.involvement_percentage)
+            for profile in self.profile_line_ids
+        ]
+        total_involvement = sum(percentage for _rate, percentage in profiles if percentage)
+        workforce_factor = changes.get('workforce_factor') or total_involvement or 1.0
+        unit_price = sum(rate * percentage for rate, percentage in profiles) / len(profiles) if profiles else 0
+
+        # Requirement lines, with their hypothetical order and work days
+        lines = [
+            (line.id, line.display_name, orders.get(line.id, line.order),
+             work_days.get(line.id, line.estimated_work_days))
+            for line in self.env[self._get_schedule_model_name()].search([('project_id', '=', self.id)])
+        ]
+
+        schedule = None
+        if self.date_start:
+            schedule = OrderSchedule(self.date_start, [(line_id, order, days) for line_id, _name, order, days in lines],
+                                     workforce_factor, self._get_working_day_index())
+
+        result_lines = []
+        for line_id, name, order, days in sorted(lines, key=lambda line: (line[2], line[0])):
+            start_date, end_date = schedule.line_dates[line_id] if schedule else (False, False)
+            result_lines.append({
+                'id': line_id,
+                'name': name,
+                'order': order,
+                'estimated_work_days': days,
+                'planned_start_date': start_date,
+                'planned_end_date': end_date,
+                'amount': unit_price * days,
+            })
+
+        return {
+            'workforce_factor': workforce_factor,
+            'unit_price': unit_price,
+            'end_date': max((line['planned_end_date'] for line in result_lines if line['planned_end_date']),
+                            default=False),
+            'total_amount': sum(line['amount'] for line in result_lines),
+            'lines': result_lines,
+        }
 
     def create_project(self):
         """
@@ -2414,8 +2957,13 @@ class Project(models.Model):
                                 'department_ids': [(6, 0, new_lot_departments.ids)]
                             })
 
-        # Recompute complexity for all subrequirement lines
-        self._recompute_subrequirements_complexity()
+        # Realign the complexity of subrequirement lines whose estimated days were set with the project
+        if vals_change_estimated_work_days(vals):
+            self._recompute_subrequirements_complexity()
+
+        # The planned dates follow the start date, the working days and the workforce factor
+        if SCHEDULE_FIELDS.intersection(vals):
+            self._mark_full_schedule_dirty()
 
         # If requirements were modified, trigger reordering after save
         if requirements_lines_need_reorder:
@@ -2448,6 +2996,7 @@ class Project(models.Model):
 
         # Execute standard create method
         projects = super().create(vals_list)
+        vals_by_project = dict(zip(projects, vals_list))
         # Handle CRM lead linking if project was created from CRM
         for project in projects:
             # Apply default task types if not already set
@@ -2460,8 +3009,10 @@ class Project(models.Model):
                 if crm_lead.exists():
                     crm_lead.write({'project_id': project.id})
 
-        # Recompute complexity for all subrequirement lines
-        projects._recompute_subrequirements_complexity()
+        # Realign the complexity of subrequirement lines whose estimated days were set with the project
+        projects.filtered(
+            lambda project: vals_change_estimated_work_days(vals_by_project[project])
+        )._recompute_subrequirements_complexity()
 
         return projects
 
@@ -1,11 +1,8 @@
+from collections import defaultdict
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
-from .common_dates import (
-    ensure_business_day,
-    get_next_business_day,
-    add_working_days,
-    adjust_duration_by_workforce
-)
+from .common_schedule import OrderSchedule
 
 
 class ProjectAbstractRequirementLine(models.AbstractModel):
@@ -48,6 +45,16 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
     planned_end_date = fields.Date(string="Date fin planifiée", compute='_compute_planned_dates',
                                    store=True, readonly=True)
 
+    # Critical-path analysis fields, maintained by the project scheduler
+    latest_start_date = fields.Date(string="Date début au plus tard", readonly=True, copy=False,
+                                    help="Date de début la plus tardive sans retarder la date de fin du projet")
+    latest_end_date = fields.Date(string="Date fin au plus tard", readonly=True, copy=False,
+                                  help="Date de fin la plus tardive sans retarder la date de fin du projet")
+    total_float = fields.Integer(string="Marge totale (jours)", readonly=True, copy=False,
+                                 help="Nombre de jours ouvrés de retard possible sans retarder la date de fin du projet")
+    is_critical = fields.Boolean(string="Chemin critique", readonly=True, copy=False,
+                                 help="Tout retard sur cette exigence retarde la date de fin du projet")
+
     # Position indicator fields
     is_first_order = fields.Boolean(string="Est premier ordre", compute="_compute_position_in_order", store=False)
     is_last_order = fields.Boolean(string="Est dernier ordre", compute="_compute_position_in_order", store=False)
@@ -122,23 +129,11 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
         for record in self:
             record.amount = record.unit_price * record.estimated_work_days
 
-    @api.depends('project_id', 'project_id.profile_line_ids', 'project_id.profile_line_ids.daily_rate',
-                 'project_id.profile_line_ids.involvement_percentage')
+    @api.depends('project_id', 'project_id.average_daily_rate')
     def _compute_unit_price(self):
         """Compute unit price based on the project's average daily rate"""
         for record in self:
-            unit_price = 0
-            if record.project_id and record.project_id.profile_line_ids:
-                total_weighted_rate = 0
-                total_profiles = len(record.project_id.profile_line_ids)
-
-                if total_profiles > 0:
-                    for profile in record.project_id.profile_line_ids:
-                        total_weighted_rate += profile.daily_rate * profile.involvement_percentage
-
-                    unit_price = total_weighted_rate / total_profiles
-
-            record.unit_price = unit_price
+            record.unit_price = record.project_id.average_daily_rate
 
     @api.constrains('order')
     def _check_order(self):
@@ -185,6 +180,24 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
     @api.depends('order', 'project_id')
     def _compute_position_in_order(self):
         """Determine if requirement is first/last in sequence and if it has parallel requirements"""
+        # Count the lines of each order for all projects at once
+        order_counts_by_project = defaultdict(dict)
+        project_ids = self.project_id._origin.ids
+        if project_ids:
+            order_groups = self.env[self._get_concrete_model_name()]._read_group(
+                [('project_id', 'in', project_ids)],
+                groupby=['project_id', 'order'],
+                aggregates=['__count'],
+            )
+            for project, order, count in order_groups:
+                order_counts_by_project[project.id][order] = count
+
+        # First and last order of each project
+        order_bounds_by_project = {
+            project_id: (min(order_counts), max(order_counts))
+            for project_id, order_counts in order_counts_by_project.items()
+        }
+
         for record in self:
             if not record.project_id or not record.order:
                 record.is_first_order = False
@@ -192,16 +205,14 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
                 record.has_parallel_requirements = False
                 continue
 
-            requirement_lines = record._get_requirement_lines_for_project()
-            all_orders = sorted(set(requirement_lines.mapped('order')))
-
-            record.is_first_order = all_orders and record.order == all_orders[0]
-            record.is_last_order = all_orders and record.order == all_orders[-1]
+            order_counts = order_counts_by_project.get(record.project_id._origin.id, {})
+            first_order, last_order = order_bounds_by_project.get(record.project_id._origin.id, (None, None))
+            record.is_first_order = record.order == first_order
+            record.is_last_order = record.order == last_order
 
-            parallel_reqs = requirement_lines.filtered(
-                lambda r: r.id != record.id and r.order == record.order
-            )
-            record.has_parallel_requirements = bool(parallel_reqs)
+            # Other lines sharing the same order (a saved record counts itself once)
+            own_count = 1 if isinstance(record.id, int) else 0
+            record.has_parallel_requirements = order_counts.get(record.order, 0) - own_count > 0
 
     def action_clear_subrequirement_lines(self):
         """
@@ -215,119 +226,102 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
         raise NotImplementedError()
 
     def _compute_planned_dates(self):
-        """Compute planned start and end dates for requirement lines."""
+        """
+        Compute planned start and end dates for requirement lines.
+        All lines of a project are scheduled together in a single pass over their order groups.
+        """
+        schedules = self._get_project_schedules()
         for line in self:
-            if not line.project_id or not line.project_id.date_start:
+            schedule = schedules.get(line.project_id.id)
+            if not schedule:
                 line.planned_start_date = False
                 line.planned_end_date = False
                 continue
 
-            project = line.project_id
-            project_start_date = project.date_start
-
-            # Calculate workforce factor
-            workforce_factor = 1.0
-            if project.profile_line_ids:
-                total_involvement = sum(profile.involvement_percentage for profile in project.profile_line_ids if
-                                        profile.involvement_percentage)
-                if total_involvement > 0:
-                    workforce_factor = total_involvement
-
-            # Group all requirement lines by order
-            lines_by_order = {}
-            for req_line in self._get_requirement_lines_for_project():
-                order = req_line.order or 0
-                if order not in lines_by_order:
-                    lines_by_order[order] = []
-                lines_by_order[order].append(req_line)
-
-            # Sort orders for processing in sequence
-            sorted_orders = sorted(lines_by_order.keys())
-
-            # Start with project start date (ensure it's a business day)
-            current_date = ensure_business_day(project_start_date)
-
-            # Process each order until we reach the current line's order
-            for order in sorted_orders:
-                if order < line.order:
-                    # For previous orders, find their earliest end date (minimum)
-                    end_dates = []
-                    for req_line in lines_by_order[order]:
-                        working_days = req_line.estimated_work_days or 0
-                        duration_days = adjust_duration_by_workforce(working_days, workforce_factor)
-                        end_date = add_working_days(current_date, duration_days)
-                        end_dates.append(end_date)
-
-                    if end_dates:
-                        # Next order starts after the earliest end date in current order
-                        current_date = get_next_business_day(min(end_dates))
-
-                elif order == line.order:
-                    # This is our line's order, calculate its dates
-                    line.planned_start_date = current_date
-
-                    # Calculate end date based on working days and workforce factor
-                    working_days = line.estimated_work_days or 0
-                    duration_days = adjust_duration_by_workforce(working_days, workforce_factor)
-                    end_date = add_working_days(current_date, duration_days)
-                    line.planned_end_date = end_date
-                    break
+            line.planned_start_date, line.planned_end_date = schedule.get_dates(
+                line.order, line.estimated_work_days)
+
+    def _get_project_schedules(self):
+        """
+        Build the order schedule of every project referenced by the lines in self.
+        The requirement lines of all projects are fetched with a single search.
+
+        Returns:
+            dict: Mapping of project id to its OrderSchedule (projects without start date are omitted)
+        """
+        projects = self.project_id.filtered('date_start')
+        if not projects:
+            return {}
+
+        all_req_lines = self.env[self._get_concrete_model_name()].search([
+            ('project_id', 'in', projects._origin.ids)
+        ])
+        lines_by_project = defaultdict(list)
+        for req_line in all_req_lines:
+            lines_by_project[req_line.project_id.id].append(
+                (req_line.id, req_line.order, req_line.estimated_work_days))
+
+        return {
+            project.id: OrderSchedule(project.date_start, lines_by_project[project._origin.id],
+                                      project._calculate_workforce_factor(),
+                                      project._get_working_day_index())
+            for project in projects
+        }
+
+    def _reschedule_from_lines(self):
+        """
+        Queue the reschedule of the order groups of the lines in self and every order group after them.
+        The queue is processed once before the transaction ends, or earlier when the client reads.
+        """
+        for line in self:
+            line.project_id._mark_schedule_dirty(line._name, [line.order])
+
+    def web_read(self, specification):
+        """Apply the queued reschedules before the client reads the planned dates"""
+        self.env['project.project']._reschedule_dirty_requirement_lines()
+        return super().web_read(specification)
 
     def _reorder_project_requirements(self, project_id=None):
         """
-        Abstract template method for reordering requirements.
-        This implements the common algorithm but delegates the actual requirement line fetching to concrete models.
+        Renumber the orders of a project's requirement lines as 1, 2, 3... while preserving parallel groups.
+        The renumbering is a single UPDATE ranking the existing orders, followed by one deferred reschedule.
         """
         if not project_id and not self:
             return
 
-        # Get project and requirements
+        # Get project
         project = project_id and self.env['project.project'].browse(project_id) or self[0].project_id
         if not project:
             return
 
         # Concrete models must provide proper implementation of _get_concrete_model_name
         model_name = self._get_concrete_model_name()
-        all_req_lines = self.env[model_name].search([
-            ('project_id', '=', project.id)
-        ], order='order, id')
-
-        if not all_req_lines:
-            return
-
-        # Group by order to preserve parallel requirements
-        order_mapping = {}
-        for line in all_req_lines:
-            if line.order not in order_mapping:
-                order_mapping[line.order] = []
-            order_mapping[line.order].append(line)
-
-        # Create new sequential ordering
-        sorted_orders = sorted(order_mapping.keys())
-        new_order_mapping = {}
-        new_order = 1
-
-        for old_order in sorted_orders:
-            if old_order > new_order:  # Gap found
-                new_order_mapping[old_order] = new_order
-                new_order += 1
-            elif old_order < new_order:  # Duplicate or out-of-sequence
-                new_order_mapping[old_order] = new_order
-                new_order += 1
-            else:  # Order already matches expected value
-                new_order_mapping[old_order] = old_order
-                new_order += 1
-
-        # Apply new orders while preserving parallel groups
-        for old_order, lines in order_mapping.items():
-            new_order = new_order_mapping[old_order]
-            if old_order != new_order:
-                for line in lines:
-                    line.with_context(skip_reordering=True).sudo().write({'order': new_order})
-
-        # Refresh computed fields
-        if all_req_lines:
-            all_req_lines.invalidate_recordset(['planned_start_date', 'planned_end_date'])
+        line_model = self.env[model_name]
+
+        # Pending order changes must reach the database before ranking
+        line_model.flush_model(['order', 'project_id'])
+
+        self.env.cr.execute(f"""
+            UPDATE {line_model._table} AS line
+               SET "order" = ranked.new_order
+              FROM (
+                    SELECT id, dense_rank() OVER (ORDER BY "order") AS new_order
+                      FROM {line_model._table}
+                     WHERE project_id = %s
+                   ) AS ranked
+             WHERE line.id = ranked.id
+               AND line."order" != ranked.new_order
+         RETURNING line.id
+        """, (project.id,))
+        renumbered_lines = line_model.browse([row[0] for row in self.env.cr.fetchall()])
+
+        # Refresh the cache of renumbered lines
+        if renumbered_lines:
+            renumbered_lines.invalidate_recordset(['order'])
+            renumbered_lines.modified(['order'])
+
+        # Queue a single reschedule of the project
+        project._mark_schedule_dirty(model_name)
 
     def action_move_up(self):
         """Move requirement one position up by swapping with previous order"""
@@ -532,11 +526,9 @@ class ProjectAbstractRequirementLine(models.AbstractModel):
             for project in projects:
                 self._reorder_project_requirements(project.id)
 
-        # Invalidate the cache for remaining lines to ensure proper recomputation
+        # Queue the reschedule of the remaining lines
+        projects = projects.exists()
         if projects:
-            model_name = self._get_concrete_model_name()
-            remaining_lines = self.env[model_name].search([('project_id', 'in', projects.ids)])
-            if remaining_lines:
-                remaining_lines.invalidate_recordset(['planned_start_date', 'planned_end_date'])
+            projects._mark_schedule_dirty(self._get_concrete_model_name())
 
         return result
@@ -64,9 +64,15 @@ class ProjectAbstractSubrequirementLine(models.AbstractModel):
         if not parent_field_name:
             return
 
-        for record in self:
-            parent = record[parent_field_name]
-            if parent:
-                parent._compute_estimated_work_days()
-                parent._compute_planned_dates()
-                parent._compute_estimated_days()
+        parents = self.mapped(parent_field_name)
+        if not parents:
+            return
+
+        parents._compute_estimated_work_days()
+        if any(not parent.id for parent in parents):
+            # Unsaved records (onchange): compute the dates in memory only
+            parents._compute_planned_dates()
+            parents._compute_estimated_days()
+        else:
+            # Reschedule the order groups of the parents and the groups after them
+            parents._reschedule_from_lines()
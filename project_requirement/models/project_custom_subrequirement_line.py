@@ -80,7 +80,7 @@ class ProjectCustomSubrequirementLine(models.Model):
         result = super(ProjectCustomSubrequirementLine, self).create(vals_list)
 
         # Force recomputation of parent requirement line estimated work days
-        self._update_parent_requirement_line()
+        result._update_parent_requirement_line()
 
         return result
 
@@ -107,10 +107,12 @@ class ProjectCustomSubrequirementLine(models.Model):
         result = super().unlink()
 
         # Trigger recomputation on parent requirement lines
+        requirement_lines = requirement_lines.exists()
         if requirement_lines:
             requirement_lines._compute_estimated_work_days()
-            requirement_lines._compute_planned_dates()
-            requirement_lines._compute_estimated_days()
+            requirement_lines._reschedule_from_lines()
+
+        return result
 
     def _get_concrete_model_name(self):
         """Return the technical name of this model"""
@@ -2,6 +2,7 @@ import logging
 
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
+from .common_dates import is_business_day
 from .common_projects import get_generic_department
 
 _logger = logging.getLogger(__name__)
@@ -122,6 +123,27 @@ class ProjectDepartmentLot(models.Model):
             # UNION (Departments already assigned to this current lot - to allow removal)
             self.available_department_ids = (selectable_departments - assigned_departments_to_other_lots) | self.department_ids
 
+    @api.onchange('mep_planned_date', 'delivery_planned_date')
+    def _onchange_planned_dates(self):
+        """
+        Trigger warning when a planned date falls on a weekend or a holiday of the company.
+        """
+        if not self.project_id:
+            return
+
+        calendar = self.project_id._get_working_day_index()
+        for lot_date, label in ((self.mep_planned_date, _("MEP")), (self.delivery_planned_date, _("livraison"))):
+            if lot_date and not is_business_day(lot_date, calendar):
+                return {
+                    'warning': {
+                        'title': _("Date non ouvrée"),
+                        'message': _("La date de {} prévue ({}) tombe sur un weekend ou un jour férié.").format(
+                            label,
+                            lot_date.strftime('%d/%m/%Y')
+                        )
+                    }
+                }
+
     @api.constrains('mep_planned_date', 'delivery_planned_date')
     def _check_dates(self):
         """Check that dates are valid in relation to project dates"""
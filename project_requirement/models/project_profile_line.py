@@ -18,6 +18,13 @@ class ProjectProfileLine(models.Model):
         ('full', 'Temps plein')
     ]
 
+    INVOLVEMENT_PERCENTAGES = {
+        'quarter': 0.25,
+        'half': 0.50,
+        'three_quarter': 0.75,
+        'full': 1.0
+    }
+
     project_id = fields.Many2one('project.project', string="Projet",
                                  required=True, ondelete='cascade')
     project_stage = fields.Selection(related='project_id.stage', string="Étape du projet", store=True)
@@ -33,6 +40,28 @@ class ProjectProfileLine(models.Model):
     workload_days = fields.Float(string="Charge (Jours)", required=True, default=0,
                                  help="Nombre de jours ouvrés estimés pour ce profil")
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Reschedule the requirement lines of the projects, whose workforce factor changes"""
+        lines = super().create(vals_list)
+        lines.project_id._mark_full_schedule_dirty()
+        return lines
+
+    def write(self, vals):
+        """Reschedule the requirement lines of the projects when their workforce factor changes"""
+        projects = self.project_id
+        result = super().write(vals)
+        if 'involvement' in vals or 'project_id' in vals:
+            (projects | self.project_id)._mark_full_schedule_dirty()
+        return result
+
+    def unlink(self):
+        """Reschedule the requirement lines of the projects, whose workforce factor changes"""
+        projects = self.project_id
+        result = super().unlink()
+        projects.exists()._mark_full_schedule_dirty()
+        return result
+
     @api.onchange('role_id')
     def _onchange_role_id(self):
         """Set daily rate when role changes if it has a default value"""
@@ -43,14 +72,8 @@ class ProjectProfileLine(models.Model):
     @api.depends('involvement')
     def _compute_involvement_percentage(self):
         """Compute the involvement percentage based on the involvement selection"""
-        percentages = {
-            'quarter': 0.25,
-            'half': 0.50,
-            'three_quarter': 0.75,
-            'full': 1.0
-        }
         for record in self:
-            record.involvement_percentage = percentages.get(record.involvement, 1.0)
+            record.involvement_percentage = self.INVOLVEMENT_PERCENTAGES.get(record.involvement, 1.0)
 
     @api.constrains('involvement_percentage')
     def _check_involvement_percentage(self):
@@ -1,5 +1,12 @@
-from odoo import models, fields, api, _
+from collections import defaultdict
+
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
+from odoo.tools import frozendict
+from .common_cache import CATALOGUE_VERSION_KEY, get_cache_version, bump_cache_version
+
+# Fields of the requirements held by the catalogue snapshot
+CATALOGUE_SNAPSHOT_FIELDS = {'sequence', 'type', 'department_id'}
 
 
 class ProjectRequirement(models.Model):
@@ -95,6 +102,110 @@ class ProjectRequirement(models.Model):
                       "Veuillez supprimer toutes les sous-exigences avant de changer le département.")
                 )
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Override create to invalidate the catalogue snapshot"""
+        result = super(ProjectRequirement, self).create(vals_list)
+        self._invalidate_catalogue_snapshot()
+        return result
+
     def write(self, vals):
-        """Override write to handle department changes with confirmation"""
-        return super(ProjectRequirement, self).write(vals)
+        """Override write to invalidate the catalogue snapshot when a field it holds changes"""
+        result = super(ProjectRequirement, self).write(vals)
+        if CATALOGUE_SNAPSHOT_FIELDS.intersection(vals):
+            self._invalidate_catalogue_snapshot()
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the catalogue snapshot"""
+        result = super(ProjectRequirement, self).unlink()
+        self._invalidate_catalogue_snapshot()
+        return result
+
+    @api.model
+    def _invalidate_catalogue_snapshot(self):
+        """Give the catalogue snapshot a new version, rebuilt by each worker on its next read"""
+        bump_cache_version(self.env.cr, CATALOGUE_VERSION_KEY)
+
+    @api.model
+    def _get_catalogue_snapshot(self):
+        """Return the in-memory snapshot of the requirement catalogue, see _build_catalogue_snapshot"""
+        return self._build_catalogue_snapshot(get_cache_version(self.env.cr, CATALOGUE_VERSION_KEY))
+
+    @api.model
+    @tools.ormcache('version')
+    def _build_catalogue_snapshot(self, version):
+        """
+        Build the in-memory snapshot of the requirement catalogue, shared by the database's workers.
+        Cached per version, the version changes whenever a requirement or a subrequirement of the
+        snapshot is created or deleted, or one of its fields held by the snapshot is modified.
+
+        Returns:
+            tuple: (requirements_by_department, subrequirements_by_requirement) where
+                requirements_by_department maps a department id to its (id, sequence, type) tuples
+                and subrequirements_by_requirement maps a requirement id to the
+                (id, complexity, estimated_work_days, department_id) tuples of its default
+                subrequirements (excluding 'etude_chiffrage' ones), both in catalogue order
+        """
+        requirements_by_department = defaultdict(list)
+        for requirement in self.sudo().search_read([], ['sequence', 'type', 'department_id'], order='sequence, id'):
+            requirements_by_department[requirement['department_id'][0]].append(
+                (requirement['id'], requirement['sequence'], requirement['type']))
+
+        subrequirements_by_requirement = defaultdict(list)
+        subrequirements = self.env['project.subrequirement'].sudo().search_read(
+            [('project_type', '!=', 'etude_chiffrage')],
+            ['requirement_id', 'complexity', 'estimated_work_days', 'department_id'],
+            order='sequence, id')
+        for subrequirement in subrequirements:
+            subrequirements_by_requirement[subrequirement['requirement_id'][0]].append((
+                subrequirement['id'],
+                subrequirement['complexity'],
+                subrequirement['estimated_work_days'],
+                subrequirement['department_id'] and subrequirement['department_id'][0],
+            ))
+
+        return (
+            frozendict({key: tuple(value) for key, value in requirements_by_department.items()}),
+            frozendict({key: tuple(value) for key, value in subrequirements_by_requirement.items()}),
+        )
+
+    @api.model
+    def _get_catalogue_requirements(self, department_ids, snapshot=None):
+        """
+        Return the catalogue requirements of the given departments from the snapshot.
+
+        Args:
+            department_ids: Ids of the departments
+            snapshot: Catalogue snapshot already read by the caller for a batch, read again if not given
+
+        Returns:
+            list: (id, sequence, type) tuples, ordered by sequence and id like the requirement search
+        """
+        requirements_by_department = (snapshot or self._get_catalogue_snapshot())[0]
+        return sorted(
+            (requirement for department_id in set(department_ids)
+             for requirement in requirements_by_department.get(department_id, ())),
+            key=lambda requirement: (requirement[1], requirement[0]),
+        )
+
+    @api.model
+    def _get_catalogue_subrequirement_vals(self, requirement_id, snapshot=None):
+        """
+        Return the values of the default subrequirement lines of a requirement from the snapshot.
+
+        Args:
+            requirement_id: Id of the requirement
+            snapshot: Catalogue snapshot already read by the caller for a batch, read again if not given
+
+        Returns:
+            list: One dict per subrequirement with the keys 'subrequirement_id', 'department_id',
+            'complexity' and 'estimated_work_days'
+        """
+        return [{
+            'subrequirement_id': subrequirement_id,
+            'department_id': department_id,
+            'complexity': complexity,
+            'estimated_work_days': estimated_work_days,
+        } for subrequirement_id, complexity, estimated_work_days, department_id
+            in (snapshot or self._get_catalogue_snapshot())[1].get(requirement_id, ())]
@@ -131,25 +131,14 @@ class ProjectRequirementLine(models.Model):
         self.subrequirement_line_ids = [(5, 0, 0)]  # Command 5: Delete all
 
         if self.requirement_id:
-            # Get all subrequirements for the selected requirement, excluding 'etude_chiffrage' type
-            subrequirements = self.requirement_id.subrequirement_ids.filtered(
-                lambda s: s.project_type != 'etude_chiffrage'
-            )
-
-            # Only proceed if there are subrequirements to add
-            if subrequirements:
-                # Add all subrequirements in a single operation
-                values = []
-                for subreq in subrequirements:
-                    values.append((0, 0, {
-                        'subrequirement_id': subreq.id,
-                        'complexity': subreq.complexity,
-                        'estimated_work_days': subreq.estimated_work_days,
-                    }))
-
-                # Add all new subrequirements at once
-                if values:
-                    self.subrequirement_line_ids = values
+            # Get all subrequirements for the selected requirement from the catalogue snapshot,
+            # excluding 'etude_chiffrage' type
+            values = [(0, 0, vals) for vals in self.env['project.requirement']._get_catalogue_subrequirement_vals(
+                self.requirement_id.id)]
+
+            # Add all new subrequirements at once
+            if values:
+                self.subrequirement_line_ids = values
 
         # Force recomputation of dates and other computed fields
         self.invalidate_recordset(['planned_start_date', 'planned_end_date'])
@@ -203,28 +192,18 @@ class ProjectRequirementLine(models.Model):
         if self.env.context.get('skip_auto_subrequirements'):
             return result
 
-        # For each created requirement line, create its subrequirements
-        for record in result:
-            if record.requirement_id:
-                # Get all subrequirements for the selected requirement, excluding 'etude_chiffrage' type
-                subrequirements = record.requirement_id.subrequirement_ids.filtered(
-                    lambda s: s.project_type != 'etude_chiffrage'
-                )
-
-                # Only proceed if there are subrequirements to add and none exist yet
-                if subrequirements and not record.subrequirement_line_ids:
-                    # Add all subrequirements in a single operation
-                    values = []
-                    for subreq in subrequirements:
-                        values.append((0, 0, {
-                            'subrequirement_id': subreq.id,
-                            'complexity': subreq.complexity,
-                            'estimated_work_days': subreq.estimated_work_days,
-                        }))
-
-                    # Add all new subrequirements at once
-                    if values:
-                        record.subrequirement_line_ids = values
+        # For each created requirement line without subrequirements yet, create the default ones
+        # from the catalogue snapshot (excluding 'etude_chiffrage' type), all in a single batch
+        catalogue = self.env['project.requirement']
+        snapshot = catalogue._get_catalogue_snapshot()
+        subreq_vals_list = [
+            dict(vals, requirement_line_id=record.id)
+            for record in result
+            if record.requirement_id and not record.subrequirement_line_ids
+            for vals in catalogue._get_catalogue_subrequirement_vals(record.requirement_id.id, snapshot)
+        ]
+        if subreq_vals_list:
+            self.env['project.subrequirement.line'].create(subreq_vals_list)
 
         return result
 
@@ -3,6 +3,11 @@ from odoo.exceptions import ValidationError
 from .common_requirements import COMPLEXITY_SELECTION, PROJECT_TYPE_SELECTION, SUBREQUIREMENT_TYPE_SELECTION
 from .common_requirements import get_complexity_from_days
 
+# Fields of the subrequirements held by the catalogue snapshot of the requirements
+CATALOGUE_SNAPSHOT_FIELDS = {
+    'sequence', 'requirement_id', 'department_id', 'complexity', 'estimated_work_days', 'project_type',
+}
+
 
 class ProjectSubrequirement(models.Model):
     _name = 'project.subrequirement'
@@ -46,6 +51,10 @@ class ProjectSubrequirement(models.Model):
             if self.requirement_id:
                 self.requirement_id._compute_estimated_work_days()
 
+        # Invalidate the catalogue snapshot of the requirements
+        if CATALOGUE_SNAPSHOT_FIELDS.intersection(vals):
+            self.env['project.requirement']._invalidate_catalogue_snapshot()
+
         return result
 
     @api.model_create_multi
@@ -61,7 +70,18 @@ class ProjectSubrequirement(models.Model):
                     # Provide fallback to ensure requirement_id is always set except for imports
                     raise ValueError("Le champ 'requirement_id' est obligatoire pour les sous-exigences")
 
-        return super(ProjectSubrequirement, self).create(vals_list)
+        result = super(ProjectSubrequirement, self).create(vals_list)
+
+        # Invalidate the catalogue snapshot of the requirements
+        self.env['project.requirement']._invalidate_catalogue_snapshot()
+
+        return result
+
+    def unlink(self):
+        """Override unlink to invalidate the catalogue snapshot of the requirements"""
+        result = super(ProjectSubrequirement, self).unlink()
+        self.env['project.requirement']._invalidate_catalogue_snapshot()
+        return result
 
     @api.model
     def load(self, fields, data):
@@ -1,5 +1,3 @@
-import logging
-
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
 
@@ -157,24 +155,31 @@ class ProjectSubrequirementLine(models.Model):
         result = super(ProjectSubrequirementLine, self).create(vals_list)
 
         # Set department_id and estimated_work_days from subrequirement if needed
-        for record in result:
+        # (create keeps the order of vals_list, so each record is matched with its own values)
+        for record, vals in zip(result, vals_list):
+            subrequirement = record.subrequirement_id
+            values = {}
+
             # Always set department_id from subrequirement
-            if record.subrequirement_id and record.subrequirement_id.department_id:
-                record.write({'department_id': record.subrequirement_id.department_id.id})
+            if subrequirement.department_id and record.department_id != subrequirement.department_id:
+                values['department_id'] = subrequirement.department_id.id
 
             # If no estimated_work_days was set, initialize from subrequirement
-            vals = next((v for v in vals_list if v.get('requirement_line_id') == record.requirement_line_id.id and
-                         v.get('subrequirement_id') == record.subrequirement_id.id), {})
-            if not vals.get(
-                    'estimated_work_days') and record.subrequirement_id and record.subrequirement_id.estimated_work_days:
-                record.write({'estimated_work_days': record.subrequirement_id.estimated_work_days})
+            if not vals.get('estimated_work_days') and subrequirement.estimated_work_days:
+                values['estimated_work_days'] = subrequirement.estimated_work_days
+
+            if values:
+                record.write(values)
+
+        # Queue the reschedule of the parent requirement lines
+        result.requirement_line_id._reschedule_from_lines()
 
         return result
 
     def write(self, values):
         """
         Override write to update parent requirement line and project dates when estimated days change.
-        Uses Odoo 18's notification system for safer field recomputation.
+        The project dates are rescheduled once per transaction through the deferred schedule queue.
         """
         # Trim trailing spaces if needed
         self._trim_trailing_spaces(values)
@@ -198,39 +203,27 @@ class ProjectSubrequirementLine(models.Model):
 
             # First update the immediate parent requirement lines
             if req_lines:
-                # Use a try-except block to handle any errors during recomputation
-                try:
-                    # Force update of is_modified
-                    for record in self:
-                        record._compute_is_modified()
-
-                    # Safely update working days on parent requirement lines
-                    req_lines._compute_estimated_work_days()
-
-                    # Get all project requirement lines that need updating
-                    projects = req_lines.mapped('project_id').exists()
-                    if projects:
-                        # Find all requirement lines in these projects
-                        all_project_lines = self.env['project.requirement.line'].search([
-                            ('project_id', 'in', projects.ids)
-                        ])
-
-                        if all_project_lines:
-                            # First, force compute on the specific lines we modified
-                            for req_line in req_lines:
-                                req_line.with_context(skip_date_validation=True)._compute_planned_dates()
-                                req_line.with_context(skip_date_validation=True)._compute_estimated_days()
-
-                            # Then recompute all lines in the project for consistency (dates depend on each other)
-                            all_project_lines.with_context(skip_date_validation=True)._compute_planned_dates()
-                            all_project_lines.with_context(skip_date_validation=True)._compute_estimated_days()
-
-                            # Force an immediate UI update by committing the transaction
-                            self.env.cr.commit()
-
-                except Exception as e:
-                    # Log the error but don't raise it to prevent transaction rollback
-                    logging.error(f"Error during recomputation: {str(e)}")
+                # Force update of is_modified
+                for record in self:
+                    record._compute_is_modified()
+
+                # Update working days on parent requirement lines
+                req_lines._compute_estimated_work_days()
+
+                # Queue the reschedule of the modified order groups and the groups after them
+                # (dates depend on each other), it runs once before the transaction ends
+                req_lines._reschedule_from_lines()
+
+        return result
+
+    def unlink(self):
+        """Override unlink to reschedule the parent requirement lines."""
+        requirement_lines = self.mapped('requirement_line_id')
+
+        result = super().unlink()
+
+        # Queue the reschedule of the remaining parent requirement lines
+        requirement_lines.exists()._reschedule_from_lines()
 
         return result
 
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from .common_dates import ensure_business_day
 from .common_requirements import START_WORK_TIME, END_WORK_TIME, HOURS_PER_DAY
 
 
@@ -25,6 +26,12 @@ class ProjectTask(models.Model):
     requirement_name = fields.Char(string="Nom de l'exigence", compute="_compute_requirement_info", store=True)
     department_name = fields.Char(string="Nom du département", compute="_compute_requirement_info", store=True)
 
+    # Critical-path analysis of the requirement line (of the parent task for subtasks)
+    is_critical_requirement = fields.Boolean(string="Chemin critique", compute="_compute_requirement_schedule_float",
+                                             help="Tout retard sur cette exigence retarde la date de fin du projet")
+    requirement_total_float = fields.Integer(string="Marge totale (jours)",
+                                             compute="_compute_requirement_schedule_float")
+
     @api.depends('requirement_id', 'project_id', 'requirement_line_id', 'custom_requirement_line_id')
     def _compute_requirement_allocated_hours(self):
         """
@@ -39,6 +46,19 @@ class ProjectTask(models.Model):
         
         Convert days to hours using HOURS_PER_DAY constant
         """
+        # Resolve the requirement lines of the tasks without a line reference with a single query
+        fallback_tasks = self.filtered(
+            lambda t: t.requirement_id and t.project_id and not (t.requirement_line_id or t.custom_requirement_line_id))
+        requirement_lines_by_key = {}
+        if fallback_tasks:
+            requirement_lines = self.env['project.requirement.line'].search_fetch([
+                ('project_id', 'in', fallback_tasks.project_id.ids),
+                ('requirement_id', 'in', fallback_tasks.requirement_id.ids)
+            ], ['project_id', 'requirement_id', 'estimated_work_days'], order='order, planned_end_date, id')
+            for requirement_line in requirement_lines:
+                requirement_lines_by_key.setdefault(
+                    (requirement_line.project_id.id, requirement_line.requirement_id.id), requirement_line)
+
         for task in self:
             # Skip computation for tasks without any requirement reference - keep existing value for manual entry
             if not (task.requirement_id or task.requirement_line_id or task.custom_requirement_line_id):
@@ -59,10 +79,7 @@ class ProjectTask(models.Model):
             # Fallback to requirement lookup if neither direct line reference exists but requirement_id is set
             elif task.project_id and task.requirement_id:
                 # Find the requirement line in the project that matches this task's requirement
-                requirement_line = self.env['project.requirement.line'].search([
-                    ('project_id', '=', task.project_id.id),
-                    ('requirement_id', '=', task.requirement_id.id)
-                ], limit=1)
+                requirement_line = requirement_lines_by_key.get((task.project_id.id, task.requirement_id.id))
 
                 # If found, use its estimated_work_days
                 if requirement_line and requirement_line.estimated_work_days:
@@ -92,16 +109,32 @@ class ProjectTask(models.Model):
                 task.requirement_name = False
                 task.department_name = False
 
+    @api.depends('requirement_line_id.is_critical', 'requirement_line_id.total_float',
+                 'custom_requirement_line_id.is_critical', 'custom_requirement_line_id.total_float',
+                 'parent_id.requirement_line_id.is_critical', 'parent_id.requirement_line_id.total_float',
+                 'parent_id.custom_requirement_line_id.is_critical', 'parent_id.custom_requirement_line_id.total_float')
+    def _compute_requirement_schedule_float(self):
+        """Expose the critical-path analysis of the task's requirement line, or of its parent task's line"""
+        for task in self:
+            requirement_line = (task.requirement_line_id or task.custom_requirement_line_id or
+                                task.parent_id.requirement_line_id or task.parent_id.custom_requirement_line_id)
+            task.is_critical_requirement = requirement_line.is_critical
+            task.requirement_total_float = requirement_line.total_float
+
     @api.onchange('planned_date_begin')
     def _onchange_planned_date_begin(self):
-        """Set start time to START_WORK_TIME when a new date is set or time is midnight"""
+        """
+        Set start time to START_WORK_TIME when a new date is set or time is midnight.
+        The date is moved to the next working day of the company calendar if needed.
+        """
         if not self.planned_date_begin:
             return
 
         # Always set standard start time for newly added dates or midnight times
         if self._origin.planned_date_begin is False or self.planned_date_begin.time() == datetime.min.time():
+            company = self.company_id or self.env.company
             self.planned_date_begin = datetime.combine(
-                self.planned_date_begin.date(),
+                ensure_business_day(self.planned_date_begin.date(), company._get_working_day_index()),
                 START_WORK_TIME
             )
 
@@ -144,133 +177,81 @@ class ProjectTask(models.Model):
                                           'start_date': start_date,
                                       })
 
-    @api.constrains('planned_date_begin', 'parent_id')
-    def _check_subtask_start_date_constraints(self):
-        """Ensure subtask start date is within parent task timeframe"""
-        # Skip check if no tasks need validation
-        if not self:
-            return
-
-        # Process only tasks with parents and start dates (direct access is faster than filtered)
-        parent_dict = {}
-        for task in self:
-            # Skip if missing required fields
-            if not task.parent_id or not task.planned_date_begin:
-                continue
-
-            # Cache parent to avoid multiple lookups
-            parent_id = task.parent_id.id
-            if parent_id not in parent_dict:
-                parent_dict[parent_id] = task.parent_id
-
-            parent = parent_dict[parent_id]
-            if not parent.planned_date_begin:
-                continue
-
-            # 1. Check if subtask start date is before parent start date
-            if task.planned_date_begin < parent.planned_date_begin:
-                parent_date = parent.planned_date_begin.strftime('%d/%m/%Y %H:%M')
-                subtask_date = task.planned_date_begin.strftime('%d/%m/%Y %H:%M')
-                raise ValidationError(_("La date de début de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
-                                        "doit être > à celle de la tâche (%(parent_date)s).") %
-                                      {
-                                          'subtask_name': task.name,
-                                          'subtask_date': subtask_date,
-                                          'parent_date': parent_date,
-                                      })
-
-            # 2. Check if subtask start date is after parent end date
-            if parent.date_deadline and task.planned_date_begin > parent.date_deadline:
-                parent_date = parent.date_deadline.strftime('%d/%m/%Y %H:%M')
-                subtask_date = task.planned_date_begin.strftime('%d/%m/%Y %H:%M')
-                raise ValidationError(_("La date de début de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
-                                        "doit être < à la date de fin de la tâche (%(parent_date)s).") %
-                                      {
-                                          'subtask_name': task.name,
-                                          'subtask_date': subtask_date,
-                                          'parent_date': parent_date,
-                                      })
-
-    @api.constrains('date_deadline', 'parent_id')
-    def _check_subtask_end_date_constraints(self):
-        """Ensure subtask end date is within parent task timeframe"""
-        # Skip check if no tasks need validation
-        if not self:
-            return
-
-        # Process only tasks with parents and end dates (direct access is faster than filtered)
-        parent_dict = {}
-        for task in self:
-            # Skip if missing required fields
-            if not task.parent_id or not task.date_deadline:
-                continue
-
-            # Cache parent to avoid multiple lookups
-            parent_id = task.parent_id.id
-            if parent_id not in parent_dict:
-                parent_dict[parent_id] = task.parent_id
-
-            parent = parent_dict[parent_id]
-            if not parent.planned_date_begin:
-                continue
-
-            # 1. Check if subtask end date is after parent end date
-            if parent.date_deadline and task.date_deadline > parent.date_deadline:
-                parent_date = parent.date_deadline.strftime('%d/%m/%Y %H:%M')
-                subtask_date = task.date_deadline.strftime('%d/%m/%Y %H:%M')
-                raise ValidationError(_("La date de fin de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
-                                        "doit être < à celle de la tâche (%(parent_date)s).") %
-                                      {
-                                          'subtask_name': task.name,
-                                          'subtask_date': subtask_date,
-                                          'parent_date': parent_date,
-                                      })
-
-            # 2. Check if subtask end date is before parent start date
-            if task.date_deadline < parent.planned_date_begin:
-                parent_date = parent.planned_date_begin.strftime('%d/%m/%Y %H:%M')
-                subtask_date = task.date_deadline.strftime('%d/%m/%Y %H:%M')
-                raise ValidationError(_("La date de fin de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
-                                        "doit être > à la date de début de la tâche (%(parent_date)s).") %
-                                      {
-                                          'subtask_name': task.name,
-                                          'subtask_date': subtask_date,
-                                          'parent_date': parent_date,
-                                      })
-
-    @api.constrains('allocated_hours', 'parent_id')
-    def _check_subtask_allocated_hours_constraint(self):
-        """Ensure total allocated hours of subtasks is less than parent task's allocated hours"""
-        # Skip check if no tasks need validation
-        if not self:
+    @api.constrains('planned_date_begin', 'date_deadline', 'allocated_hours', 'parent_id')
+    def _check_subtask_constraints(self):
+        """
+        Ensure subtasks stay within their parent task timeframe and that the total allocated hours
+        of subtasks does not exceed the parent task's allocated hours.
+        Parents and subtask hours are loaded in two queries and all violations are reported together.
+        """
+        subtasks = self.filtered('parent_id')
+        if not subtasks:
             return
 
-        # Process only tasks with parents and allocated hours
-        parent_dict = {}
-        for task in self:
-            # Skip if missing required fields
-            if not task.parent_id or not task.allocated_hours:
-                continue
-
-            # Cache parent to avoid multiple lookups
-            parent_id = task.parent_id.id
-            if parent_id not in parent_dict:
-                parent_dict[parent_id] = task.parent_id
-
-            parent = parent_dict[parent_id]
-            if not parent.allocated_hours:
-                continue
-
-            # Calculate total allocated hours of all subtasks
-            subtask_total_hours = sum(subtask.allocated_hours for subtask in parent.child_ids)
+        # Prefetch the parents and the total allocated hours of their subtasks
+        parents = subtasks.parent_id
+        parents.fetch(['planned_date_begin', 'date_deadline', 'allocated_hours'])
+        subtask_hours_by_parent = {
+            parent.id: allocated_hours
+            for parent, allocated_hours in self.env['project.task']._read_group(
+                [('parent_id', 'in', parents.ids)], ['parent_id'], ['allocated_hours:sum'])
+        }
 
-            # Check if subtask total hours exceeds parent allocated hours
-            if subtask_total_hours > parent.allocated_hours:
-                raise ValidationError(_("Le temps total alloué des sous-tâches (%(subtask_hours)s heures) "
-                                        "doit être inférieur au temps alloué de la tâche parent (%(parent_hours)s heures).") % {
-                                          'subtask_hours': subtask_total_hours,
-                                          'parent_hours': parent.allocated_hours,
-                                      })
+        def format_date(value):
+            return value.strftime('%d/%m/%Y %H:%M')
+
+        errors = []
+        checked_parent_ids = set()
+        for task in subtasks:
+            parent = task.parent_id
+
+            # 1. Check if subtask start date is within the parent timeframe
+            if parent.planned_date_begin and task.planned_date_begin:
+                if task.planned_date_begin < parent.planned_date_begin:
+                    errors.append(_("La date de début de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
+                                    "doit être > à celle de la tâche (%(parent_date)s).") % {
+                        'subtask_name': task.name,
+                        'subtask_date': format_date(task.planned_date_begin),
+                        'parent_date': format_date(parent.planned_date_begin),
+                    })
+                if parent.date_deadline and task.planned_date_begin > parent.date_deadline:
+                    errors.append(_("La date de début de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
+                                    "doit être < à la date de fin de la tâche (%(parent_date)s).") % {
+                        'subtask_name': task.name,
+                        'subtask_date': format_date(task.planned_date_begin),
+                        'parent_date': format_date(parent.date_deadline),
+                    })
+
+            # 2. Check if subtask end date is within the parent timeframe
+            if parent.planned_date_begin and task.date_deadline:
+                if parent.date_deadline and task.date_deadline > parent.date_deadline:
+                    errors.append(_("La date de fin de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
+                                    "doit être < à celle de la tâche (%(parent_date)s).") % {
+                        'subtask_name': task.name,
+                        'subtask_date': format_date(task.date_deadline),
+                        'parent_date': format_date(parent.date_deadline),
+                    })
+                if task.date_deadline < parent.planned_date_begin:
+                    errors.append(_("La date de fin de la sous-tâche '%(subtask_name)s' (%(subtask_date)s) "
+                                    "doit être > à la date de début de la tâche (%(parent_date)s).") % {
+                        'subtask_name': task.name,
+                        'subtask_date': format_date(task.date_deadline),
+                        'parent_date': format_date(parent.planned_date_begin),
+                    })
+
+            # 3. Check the total allocated hours of the subtasks, once per parent
+            if task.allocated_hours and parent.allocated_hours and parent.id not in checked_parent_ids:
+                checked_parent_ids.add(parent.id)
+                subtask_total_hours = subtask_hours_by_parent.get(parent.id, 0)
+                if subtask_total_hours > parent.allocated_hours:
+                    errors.append(_("Le temps total alloué des sous-tâches (%(subtask_hours)s heures) "
+                                    "doit être inférieur au temps alloué de la tâche parent (%(parent_hours)s heures).") % {
+                        'subtask_hours': subtask_total_hours,
+                        'parent_hours': parent.allocated_hours,
+                    })
+
+        if errors:
+            raise ValidationError("\n".join(errors))
 
     def action_view_requirement_line(self):
         """Open the requirement form view"""
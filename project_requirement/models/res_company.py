@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+import pytz
+
+from odoo import models, fields, api, tools
+from .common_cache import WORKING_DAY_INDEX_VERSION_KEY, get_cache_version, bump_cache_version
+from .common_dates import WorkingDayIndex
+
+# Years covered by the working-day index around the current year
+WORKING_DAY_INDEX_YEARS_BEFORE = 5
+WORKING_DAY_INDEX_YEARS_AFTER = 10
+
+
+class ResCompany(models.Model):
+    """
+    Extend the company model to provide its working-day index.
+    The index excludes the global leaves (public holidays, company closures)
+    of the company's working calendar.
+    """
+    _inherit = 'res.company'
+
+    def _get_working_day_index(self):
+        """Return the cached WorkingDayIndex of the company"""
+        self.ensure_one()
+        version = get_cache_version(self.env.cr, WORKING_DAY_INDEX_VERSION_KEY % self.id)
+        return self._build_working_day_index(self.id, version)
+
+    def _invalidate_working_day_index(self):
+        """Invalidate the cached working-day indexes of the companies and reschedule their projects"""
+        if not self:
+            return
+        for company in self:
+            bump_cache_version(self.env.cr, WORKING_DAY_INDEX_VERSION_KEY % company.id)
+        self.env['project.project']._mark_company_schedules_dirty(self)
+
+    @api.model
+    @tools.ormcache('company_id', 'version')
+    def _build_working_day_index(self, company_id, version):
+        """
+        Build the working-day index of a company from its calendar leaves.
+        Cached per company and version, the version changes whenever the global leaves or the company
+        calendar change.
+        """
+        company = self.browse(company_id).sudo()
+        calendar = company.resource_calendar_id
+        tz = pytz.timezone(calendar.tz or 'UTC')
+
+        # Global leaves only: leaves linked to a resource are personal time off
+        leaves = self.env['resource.calendar.leaves'].sudo().search_read([
+            ('resource_id', '=', False),
+            ('calendar_id', 'in', [calendar.id, False] if calendar else [False]),
+            ('company_id', 'in', [company.id, False]),
+        ], ['date_from', 'date_to'])
+
+        holidays = set()
+        for leave in leaves:
+            day = pytz.utc.localize(leave['date_from']).astimezone(tz).date()
+            last_day = pytz.utc.localize(leave['date_to']).astimezone(tz).date()
+            while day <= last_day:
+                holidays.add(day)
+                day += timedelta(days=1)
+
+        today = fields.Date.today()
+        first_year = min([today.year - WORKING_DAY_INDEX_YEARS_BEFORE] + [day.year for day in holidays])
+        last_year = max([today.year + WORKING_DAY_INDEX_YEARS_AFTER] + [day.year for day in holidays])
+
+        return WorkingDayIndex(holidays, date(first_year, 1, 1), date(last_year, 12, 31))
+
+    def write(self, vals):
+        """Invalidate the working-day indexes when the company calendar changes"""
+        result = super().write(vals)
+        if 'resource_calendar_id' in vals:
+            self._invalidate_working_day_index()
+        return result
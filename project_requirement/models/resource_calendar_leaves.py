@@ -0,0 +1,42 @@
+from odoo import models, api
+
+
+class ResourceCalendarLeaves(models.Model):
+    """
+    Extend calendar leaves to keep the companies' working-day indexes up to date.
+    Only global leaves (public holidays, company closures) are in the indexes: the time off of
+    the employees, linked to a resource, leaves them untouched.
+    """
+    _inherit = 'resource.calendar.leaves'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Invalidate the working-day indexes when global leaves are added"""
+        leaves = super().create(vals_list)
+        leaves._get_working_day_index_companies()._invalidate_working_day_index()
+        return leaves
+
+    def write(self, vals):
+        """Invalidate the working-day indexes when global leaves are modified, or become or stop being global"""
+        companies = self._get_working_day_index_companies()
+        result = super().write(vals)
+        companies |= self._get_working_day_index_companies()
+        companies._invalidate_working_day_index()
+        return result
+
+    def unlink(self):
+        """Invalidate the working-day indexes when global leaves are removed"""
+        companies = self._get_working_day_index_companies()
+        result = super().unlink()
+        companies._invalidate_working_day_index()
+        return result
+
+    def _get_working_day_index_companies(self):
+        """Return the companies whose working-day index includes some of the leaves"""
+        global_leaves = self.sudo().filtered(lambda leave: not leave.resource_id)
+        if not global_leaves:
+            return self.env['res.company']
+        # Leaves without company are holidays of every company
+        if not all(global_leaves.mapped('company_id')):
+            return self.env['res.company'].sudo().search([])
+        return global_leaves.company_id
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+
+from odoo.tests.common import BaseCase
+
+from ..models.common_dates import (
+    WorkingDayIndex,
+    add_working_days,
+    add_working_days_batch,
+    count_working_days,
+    ensure_business_day,
+    get_next_business_day,
+    is_business_day,
+)
+
+# Public holidays and a year-end closure, covered by the index of the tests
+HOLIDAYS = frozenset(
+    [date(year, month, day) for year in range(2024, 2028)
+     for month, day in ((1, 1), (5, 1), (5, 8), (7, 14), (8, 15), (11, 1), (11, 11), (12, 25))]
+    + [date(2024, 4, 1), date(2024, 5, 9), date(2024, 5, 20), date(2025, 4, 21), date(2025, 5, 29),
+       date(2025, 6, 9), date(2026, 4, 6), date(2026, 5, 14), date(2026, 5, 25)]
+    + [date(year, 12, 26) + timedelta(days=offset) for year in range(2024, 2027) for offset in range(6)]
+)
+INDEX_FIRST_DATE = date(2024, 1, 1)
+INDEX_LAST_DATE = date(2027, 12, 31)
+
+# Dates of the tests: several years overlapping the index range on both sides
+FIRST_DATE = date(2022, 12, 1)
+LAST_DATE = date(2029, 2, 1)
+WORKING_DAYS = (-1, 0, 0.5, 1, 1.5, 2, 3, 4, 5, 6, 7, 9, 10, 11, 14, 23, 60, 61, 250)
+
+
+# Reference implementations: the original day-by-day loops, with the holidays skipped as well
+
+def _is_working_day(dt, holidays):
+    return dt.weekday() < 5 and dt not in holidays
+
+
+def _reference_ensure_business_day(dt, holidays=frozenset()):
+    while not _is_working_day(dt, holidays):
+        dt += timedelta(days=1)
+    return dt
+
+
+def _reference_get_next_business_day(dt, holidays=frozenset()):
+    return _reference_ensure_business_day(dt + timedelta(days=1), holidays)
+
+
+def _reference_add_working_days(start_date, working_days, holidays=frozenset()):
+    if working_days <= 0:
+        return start_date
+
+    # Start with the initial date - it counts as day 1
+    result_date = start_date
+    days_counted = 1
+
+    # Keep adding days until we reach the target working days
+    while days_counted < working_days:
+        result_date += timedelta(days=1)
+        if _is_working_day(result_date, holidays):
+            days_counted += 1
+
+    return result_date
+
+
+def _reference_count_working_days(start_date, end_date, holidays=frozenset()):
+    count = 0
+    day = start_date + timedelta(days=1)
+    while day <= end_date:
+        count += _is_working_day(day, holidays)
+        day += timedelta(days=1)
+    return count
+
+
+def _dates(first_date=FIRST_DATE, last_date=LAST_DATE, step=1):
+    day = first_date
+    while day <= last_date:
+        yield day
+        day += timedelta(days=step)
+
+
+class TestCommonDates(BaseCase):
+
+    def _check_against_reference(self, calendar, holidays):
+        for day in _dates():
+            self.assertEqual(is_business_day(day, calendar), _is_working_day(day, holidays), day)
+            self.assertEqual(ensure_business_day(day, calendar),
+                             _reference_ensure_business_day(day, holidays), day)
+            self.assertEqual(get_next_business_day(day, calendar),
+                             _reference_get_next_business_day(day, holidays), day)
+
+        for day in _dates(step=3):
+            for working_days in WORKING_DAYS:
+                self.assertEqual(add_working_days(day, working_days, calendar),
+                                 _reference_add_working_days(day, working_days, holidays),
+                                 (day, working_days))
+
+        for day in _dates(step=11):
+            for end_date in _dates(day - timedelta(days=20), day + timedelta(days=400), step=17):
+                self.assertEqual(count_working_days(day, end_date, calendar),
+                                 _reference_count_working_days(day, end_date, holidays),
+                                 (day, end_date))
+
+    def test_weekdays(self):
+        self._check_against_reference(None, frozenset())
+
+    def test_working_day_index(self):
+        calendar = WorkingDayIndex(HOLIDAYS, INDEX_FIRST_DATE, INDEX_LAST_DATE)
+        self._check_against_reference(calendar, HOLIDAYS)
+
+    def test_working_day_index_without_holidays(self):
+        calendar = WorkingDayIndex([], INDEX_FIRST_DATE, INDEX_LAST_DATE)
+        self._check_against_reference(calendar, frozenset())
+
+    def test_string_dates(self):
+        self.assertEqual(add_working_days('2025-12-24', 3), date(2025, 12, 26))
+        self.assertEqual(ensure_business_day('2025-12-27'), date(2025, 12, 29))
+        self.assertEqual(get_next_business_day('2025-12-26'), date(2025, 12, 29))
+
+    def test_empty_dates(self):
+        self.assertFalse(add_working_days(False, 5))
+        self.assertFalse(ensure_business_day(False))
+        self.assertFalse(get_next_business_day(False))
+        self.assertEqual(count_working_days(False, date(2025, 1, 1)), 0)
+
+    def test_add_working_days_batch(self):
+        for calendar, holidays in ((None, frozenset()),
+                                   (WorkingDayIndex(HOLIDAYS, INDEX_FIRST_DATE, INDEX_LAST_DATE), HOLIDAYS)):
+            start_dates = list(_dates(step=5))
+            working_days = [WORKING_DAYS[index % len(WORKING_DAYS)] for index in range(len(start_dates))]
+            self.assertEqual(
+                add_working_days_batch(start_dates, working_days, calendar),
+                [_reference_add_working_days(day, days, holidays) for day, days in zip(start_dates, working_days)])
+
+            # A single start date is shared by all the durations
+            start_date = date(2025, 12, 19)
+            self.assertEqual(
+                add_working_days_batch(start_date, WORKING_DAYS, calendar),
+                [_reference_add_working_days(start_date, days, holidays) for days in WORKING_DAYS])
+
+        with self.assertRaises(ValueError):
+            add_working_days_batch([date(2025, 1, 1)], [1, 2])
@@ -1 +1,2 @@
 from . import project_requirement_selection_wizard
+from . import project_schedule_simulation_wizard
@@ -20,21 +20,9 @@ class ProjectRequirementSelectionWizard(models.TransientModel):
             project = self.env['project.project'].browse(project_id)
             res['project_id'] = project_id
 
-            # Get selected departments in the project
-            department_ids = project.department_ids.ids
-
-            # Retrieve all requirements related to the project's departments
+            # Requirements of the project's departments that are not in the project yet
             # NOTE: Requirements themselves do not have a direct project_type field
-            domain = [
-                ('department_id', 'in', department_ids)
-            ]
-            all_dept_requirements = self.env['project.requirement'].search(domain)
-
-            # Retrieve requirements already present in the project
-            existing_req_ids = project.requirement_line_ids.mapped('requirement_id.id')
-
-            # Filter only missing requirements IDs
-            missing_requirement_ids = all_dept_requirements.filtered(lambda r: r.id not in existing_req_ids).ids
+            missing_requirement_ids = project._get_missing_requirements(with_ids=True).get(project.id, [])
 
             # Set the domain for the Many2many field
             # We store it as a JSON string because domains aren't directly storable
@@ -55,17 +43,13 @@ class ProjectRequirementSelectionWizard(models.TransientModel):
         if not self.requirement_ids:
             return {'type': 'ir.actions.act_window_close'}
 
-        # Add each selected requirement to the project
-        for requirement in self.requirement_ids:
-            self.env['project.requirement.line'].create({
-                'project_id': self.project_id.id,
-                'requirement_id': requirement.id,
-                # Copy default values if needed, like estimated days
-                # 'estimated_work_days': requirement.estimated_work_days,
-                # 'estimated_days': requirement.estimated_days,
-            })
-
-        # Reorder the requirements if necessary (optional)
-        self.project_id._reorder_requirements_after_save()
+        # Add all selected requirements to the project in one batch, after the existing ones
+        # The project is renumbered and rescheduled once
+        project = self.project_id
+        max_order = max(project.requirement_line_ids.mapped('order') or [0])
+        project._insert_requirement_lines(
+            [(requirement.id, requirement.sequence, requirement.type) for requirement in self.requirement_ids],
+            max_order,
+        )
 
         return {'type': 'ir.actions.act_window_close'}
@@ -0,0 +1,149 @@
+from odoo import api, fields, models
+
+
+class ProjectScheduleSimulationWizard(models.TransientModel):
+    _name = 'project.schedule.simulation.wizard'
+    _description = 'Assistant de simulation du planning'
+
+    project_id = fields.Many2one('project.project', string='Projet', required=True, readonly=True)
+    currency_id = fields.Many2one(related='project_id.company_id.currency_id', string='Devise')
+    profile_line_ids = fields.One2many('project.schedule.simulation.profile', 'wizard_id', string='Profils')
+    line_ids = fields.One2many('project.schedule.simulation.line', 'wizard_id', string='Exigences')
+
+    # Current schedule
+    current_end_date = fields.Date(string='Date de fin actuelle', readonly=True)
+    current_amount = fields.Monetary(string='Montant actuel', readonly=True)
+    current_workforce_factor = fields.Float(string='Facteur de charge actuel', readonly=True)
+
+    # Simulated schedule
+    simulated_end_date = fields.Date(string='Date de fin simulée', readonly=True)
+    simulated_amount = fields.Monetary(string='Montant simulé', readonly=True)
+    simulated_workforce_factor = fields.Float(string='Facteur de charge simulé', readonly=True)
+    end_date_delta = fields.Integer(string='Écart de fin (jours)', compute='_compute_end_date_delta')
+
+    @api.depends('current_end_date', 'simulated_end_date')
+    def _compute_end_date_delta(self):
+        """Calendar days between the current and the simulated end dates"""
+        for wizard in self:
+            if wizard.current_end_date and wizard.simulated_end_date:
+                wizard.end_date_delta = (wizard.simulated_end_date - wizard.current_end_date).days
+            else:
+                wizard.end_date_delta = 0
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+
+        project_id = self.env.context.get('active_id')
+        if project_id:
+            project = self.env['project.project'].browse(project_id)
+            simulation = project.simulate_schedule()
+
+            res.update({
+                'project_id': project.id,
+                'current_end_date': simulation['end_date'],
+                'current_amount': simulation['total_amount'],
+                'current_workforce_factor': simulation['workforce_factor'],
+                'simulated_end_date': simulation['end_date'],
+                'simulated_amount': simulation['total_amount'],
+                'simulated_workforce_factor': simulation['workforce_factor'],
+                'profile_line_ids': [(0, 0, {
+                    'profile_line_id': profile.id,
+                    'involvement': profile.involvement,
+                }) for profile in project.profile_line_ids],
+                'line_ids': [(0, 0, {
+                    'requirement_line_ref': line['id'],
+                    'name': line['name'],
+                    'original_order': line['order'],
+                    'order': line['order'],
+                    'original_work_days': line['estimated_work_days'],
+                    'estimated_work_days': line['estimated_work_days'],
+                    'planned_start_date': line['planned_start_date'],
+                    'planned_end_date': line['planned_end_date'],
+                    'amount': line['amount'],
+                }) for line in simulation['lines']],
+            })
+
+        return res
+
+    def _get_simulation_changes(self):
+        """Collect the hypothetical changes entered in the wizard"""
+        self.ensure_one()
+        return {
+            'involvements': {
+                profile.profile_line_id.id: profile.involvement
+                for profile in self.profile_line_ids
+                if profile.involvement != profile.profile_line_id.involvement
+            },
+            'orders': {
+                line.requirement_line_ref: line.order
+                for line in self.line_ids if line.order != line.original_order
+            },
+            'work_days': {
+                line.requirement_line_ref: line.estimated_work_days
+                for line in self.line_ids if line.estimated_work_days != line.original_work_days
+            },
+        }
+
+    def action_simulate(self):
+        """Simulate the schedule with the changes entered in the wizard, without modifying the project"""
+        self.ensure_one()
+        simulation = self.project_id.simulate_schedule(self._get_simulation_changes())
+
+        self.write({
+            'simulated_end_date': simulation['end_date'],
+            'simulated_amount': simulation['total_amount'],
+            'simulated_workforce_factor': simulation['workforce_factor'],
+        })
+
+        lines_by_ref = {line.requirement_line_ref: line for line in self.line_ids}
+        for line_values in simulation['lines']:
+            line = lines_by_ref.get(line_values['id'])
+            if line:
+                line.write({
+                    'planned_start_date': line_values['planned_start_date'],
+                    'planned_end_date': line_values['planned_end_date'],
+                    'amount': line_values['amount'],
+                })
+
+        return {
+            'name': 'Simulation du planning',
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class ProjectScheduleSimulationProfile(models.TransientModel):
+    _name = 'project.schedule.simulation.profile'
+    _description = 'Profil de simulation du planning'
+
+    wizard_id = fields.Many2one('project.schedule.simulation.wizard', string='Simulation',
+                                required=True, ondelete='cascade')
+    profile_line_id = fields.Many2one('project.profile.line', string='Profil', required=True, readonly=True)
+    role_id = fields.Many2one(related='profile_line_id.role_id', string='Rôle')
+    daily_rate = fields.Monetary(related='profile_line_id.daily_rate', string='Taux journalier')
+    currency_id = fields.Many2one(related='profile_line_id.currency_id', string='Devise')
+    involvement = fields.Selection(selection=lambda self: self.env['project.profile.line'].INVOLVEMENT_TYPES,
+                                   string='Implication', required=True)
+
+
+class ProjectScheduleSimulationLine(models.TransientModel):
+    _name = 'project.schedule.simulation.line'
+    _description = 'Ligne de simulation du planning'
+    _order = 'order, id'
+
+    wizard_id = fields.Many2one('project.schedule.simulation.wizard', string='Simulation',
+                                required=True, ondelete='cascade')
+    requirement_line_ref = fields.Integer(string="Ligne d'exigence", readonly=True)
+    name = fields.Char(string='Exigence', readonly=True)
+    original_order = fields.Integer(string='Ordre actuel', readonly=True)
+    order = fields.Integer(string='Ordre')
+    original_work_days = fields.Float(string='Charge actuelle (Jours)', readonly=True)
+    estimated_work_days = fields.Float(string='Charge (Jours)')
+    planned_start_date = fields.Date(string='Date début simulée', readonly=True)
+    planned_end_date = fields.Date(string='Date fin simulée', readonly=True)
+    currency_id = fields.Many2one(related='wizard_id.currency_id', string='Devise')
+    amount = fields.Monetary(string='Montant simulé', readonly=True)